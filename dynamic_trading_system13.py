@@ -1,9 +1,12 @@
+import argparse
 import asyncio
 import logging
 from datetime import datetime
 import random  # For simulating price movement
 import pandas as pd
 
+from utils.profiling import add_profile_arguments, run_for, run_profiled, session_from_args
+
 logging.basicConfig(
     format='[%(asctime)s] %(levelname)s %(message)s',
     level=logging.INFO
@@ -105,5 +108,17 @@ async def main():
 
         await asyncio.sleep(CHECK_INTERVAL)
 
+def profile_probes():
+    return {
+        "active_trades": lambda: len(active_trades),
+        "daily_loss": lambda: daily_loss,
+    }
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = add_profile_arguments(argparse.ArgumentParser(description="Confluence trading loop"))
+    args = parser.parse_args()
+    if args.profile:
+        session = session_from_args(args, "dynamic_trading_system13", profile_probes())
+        asyncio.run(run_profiled(main(), session, args.duration, args.report))
+    else:
+        asyncio.run(run_for(main(), args.duration))
@@ -1,22 +1,31 @@
 # dynamic_trading_system_full.py
+import argparse
 import asyncio
 import logging
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import List, Dict
 
+from execution.mark_to_market import MarkToMarket
+from execution.strategy_scheduler import StrategyScheduler
+from indicators.kernels import KernelIndicators, sl_tp_hits
+from market_data.bar_pyramid import BarPyramid
+from strategies.patterns import BULLISH, PatternTracker
+from utils.clock import WallClock
+from utils.enums import MarketRegime
+from utils.loop_monitor import LoopLagMonitor
+from utils.offload import Offloader
+from utils.profiling import add_profile_arguments, run_for, run_profiled, session_from_args
+
 # === Logging setup ===
 logging.basicConfig(level=logging.INFO, format='%(levelname)s [%(asctime)s] %(message)s')
 logger = logging.getLogger(__name__)
 
 # === Enums ===
-class MarketRegime(Enum):
-    TRENDING = "trending"
-    RANGING = "ranging"
-    VOLATILE = "volatile"
 
 class TradeType(Enum):
     BUY = "buy"
@@ -45,7 +54,8 @@ class Position:
     take_profit: float
     size: float
     entry_time: datetime
-    unrealized_pnl: float = 0.0
+    unrealized_pnl: float = 0.0  # live, refreshed from MarkToMarket on every price update
+    realized_pnl: float = 0.0
     status: str = "open"
 
 # === Market Data Provider ===
@@ -115,54 +125,79 @@ class TechnicalIndicators:
 
 # === Trading Strategies ===
 class TradingStrategies:
-    def __init__(self, data_provider):
+    def __init__(self, data_provider, clock=None, bar_pyramid=None):
         self.data_provider = data_provider
-        self.indicators = TechnicalIndicators()
+        self.clock = clock or WallClock()
+        # same results as TechnicalIndicators without the per-call pandas temporaries
+        self.indicators = KernelIndicators()
+        # multi-timeframe regime: self.bar_pyramid.regime("15m") is O(1)
+        self.bar_pyramid = bar_pyramid or BarPyramid()
+        # swings/order blocks/BOS/fib levels, updated incrementally in generate_signals
+        self.patterns = PatternTracker()
+
+    def _direction(self, event):
+        return TradeType.BUY if event.direction==BULLISH else TradeType.SELL
 
     def order_block_breakout(self, data, regime, weight):
-        if np.random.random()>0.3: return None
+        event = self.patterns.latest("order_block_retest")
+        if event is None: return None
         cp = data['close'].iloc[-1]
         atr = self.indicators.calculate_atr(data)
-        stype = TradeType.BUY if np.random.random()>0.5 else TradeType.SELL
+        stype = self._direction(event)
         sl,tp = (cp-atr*2, cp+atr*4) if stype==TradeType.BUY else (cp+atr*2, cp-atr*4)
         conf = 75+weight*50
-        return Signal("orderBlockBreakout", stype, cp, sl, tp, conf, weight, regime, datetime.now())
+        return Signal("orderBlockBreakout", stype, cp, sl, tp, conf, weight, regime, self.clock.now())
 
     def liquidity_grab(self, data, regime, weight):
-        if np.random.random()>0.2: return None
+        event = self.patterns.latest("sweep")
+        if event is None: return None
         cp = data['close'].iloc[-1]
         atr = self.indicators.calculate_atr(data)
-        stype = TradeType.SELL if np.random.random()>0.5 else TradeType.BUY
+        stype = self._direction(event)
         sl,tp = (cp-atr*1.5, cp+atr*3) if stype==TradeType.BUY else (cp+atr*1.5, cp-atr*3)
         conf = 80+weight*40
-        return Signal("liquidityGrab", stype, cp, sl, tp, conf, weight, regime, datetime.now())
+        return Signal("liquidityGrab", stype, cp, sl, tp, conf, weight, regime, self.clock.now())
 
     def fibonacci_reversal(self, data, regime, weight):
-        if np.random.random()>0.25: return None
+        event = self.patterns.latest("fib_zone")
+        if event is None: return None
         cp = data['close'].iloc[-1]
         atr = self.indicators.calculate_atr(data)
         rsi = self.indicators.calculate_rsi(data)
-        stype = TradeType.BUY if rsi<50 else TradeType.SELL
+        stype = self._direction(event)
+        # only take the retracement when momentum has cooled off in the leg's direction
+        if (stype==TradeType.BUY and rsi>=50) or (stype==TradeType.SELL and rsi<=50): return None
         sl,tp = (cp-atr*1.8, cp+atr*3.6) if stype==TradeType.BUY else (cp+atr*1.8, cp-atr*3.6)
         conf = 70 + abs(50-rsi)
-        return Signal("fibonacciReversal", stype, cp, sl, tp, conf, weight, regime, datetime.now())
+        return Signal("fibonacciReversal", stype, cp, sl, tp, conf, weight, regime, self.clock.now())
 
     def structure_break(self, data, regime, weight):
-        if np.random.random()>0.15: return None
+        event = self.patterns.latest("bos")
+        if event is None: return None
         cp = data['close'].iloc[-1]
         atr = self.indicators.calculate_atr(data)
-        stype = TradeType.BUY if np.random.random()>0.5 else TradeType.SELL
+        stype = self._direction(event)
         sl,tp = (cp-atr*2.2, cp+atr*4.4) if stype==TradeType.BUY else (cp+atr*2.2, cp-atr*4.4)
         conf = 75+weight*50
-        return Signal("structureBreak", stype, cp, sl, tp, conf, weight, regime, datetime.now())
+        return Signal("structureBreak", stype, cp, sl, tp, conf, weight, regime, self.clock.now())
 
 # === Trading Engine ===
 class DynamicTradingSystem:
-    def __init__(self):
-        self.data_provider = MarketDataProvider()
-        self.strategies = TradingStrategies(self.data_provider)
+    def __init__(self, data_provider=None, exchange=None, clock=None, executor=None, max_inflight=4,
+                 lag_threshold_ms=50.0, regime_timeframe="5m"):
+        # data_provider/exchange can be swapped for execution.simulated_exchange for load tests
+        self.data_provider = data_provider or MarketDataProvider()
+        self.exchange = exchange
+        # replay providers bring their own VirtualClock
+        self.clock = clock or getattr(self.data_provider, "clock", None) or WallClock()
+        # regime comes from the pyramid's closed bars instead of a rescan of the DataFrame
+        self.bar_pyramid = BarPyramid()
+        self.regime_timeframe = regime_timeframe
+        self.strategies = TradingStrategies(self.data_provider, self.clock, self.bar_pyramid)
         self.positions: List[Position] = []
         self.account_balance = 10000
+        # live equity, drawdown and per-strategy PnL, marked on every price update
+        self.mtm = MarkToMarket(self.account_balance)
         self.trade_counter = 0
         self.strategy_weights = {
             "orderBlockBreakout":0.25,
@@ -170,72 +205,136 @@ class DynamicTradingSystem:
             "fibonacciReversal":0.25,
             "structureBreak":0.25
         }
+        # indicator/strategy work runs in the executor so the loop only does I/O and timers.
+        # It must be a thread executor: the offloaded work is bound methods that update the
+        # shared pattern tracker, which neither pickles nor comes back from a child process.
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError("DynamicTradingSystem needs a thread executor, not a ProcessPoolExecutor")
+        self.offloader = Offloader(executor, max_inflight)
+        self.loop_monitor = LoopLagMonitor(threshold_ms=lag_threshold_ms)
+        # per-cycle deadlines (seconds) and priorities; SL/TP handling always runs before these
+        self.scheduler = StrategyScheduler(is_stale=self._bar_is_stale, offloader=self.offloader)
+        for priority, (strat_name, func, deadline) in enumerate([
+            ("structureBreak", self.strategies.structure_break, 0.25),
+            ("orderBlockBreakout", self.strategies.order_block_breakout, 0.25),
+            ("liquidityGrab", self.strategies.liquidity_grab, 0.25),
+            ("fibonacciReversal", self.strategies.fibonacci_reversal, 0.25)
+        ]):
+            self.scheduler.add(strat_name, func, priority, deadline)
 
-    async def generate_signals(self):
+    def _bar_is_stale(self, bar_time):
+        # a newer bar has arrived since the strategies' input was taken. Providers fed from
+        # outside the loop (BusDataProvider) expose latest_timestamp() to peek at the feed
+        # without consuming it; the others only add bars when the engine asks for them.
+        peek = getattr(self.data_provider, "latest_timestamp", None)
+        if peek is not None:
+            latest = peek()
+            return latest is not None and latest>bar_time
+        data = self.data_provider.data
+        return len(data)>0 and data['timestamp'].iloc[-1]>bar_time
+
+    def _prepare_inputs(self):
         data = self.data_provider.get_historical_data()
-        regime = TechnicalIndicators.detect_market_regime(data)
-        signals = []
-        for strat_name, func in [
-            ("orderBlockBreakout", self.strategies.order_block_breakout),
-            ("liquidityGrab", self.strategies.liquidity_grab),
-            ("fibonacciReversal", self.strategies.fibonacci_reversal),
-            ("structureBreak", self.strategies.structure_break)
-        ]:
-            sig = func(data, regime, self.strategy_weights[strat_name])
-            if sig: signals.append(sig)
-        return signals
+        self.bar_pyramid.sync(data)
+        regime = self.bar_pyramid.regime(self.regime_timeframe)
+        self.strategies.patterns.sync(data)
+        return data, regime
+
+    async def generate_signals(self):
+        data, regime = await self.offloader.run(self._prepare_inputs)
+        return await self.scheduler.run(data, regime, self.strategy_weights, data['timestamp'].iloc[-1])
 
     async def execute_signals(self, signals: List[Signal]):
         for sig in signals:
-            self.trade_counter +=1
             size = self.account_balance*0.01 # 1% per trade
+            entry = sig.entry
+            if self.exchange is not None:
+                fill = await self.exchange.execute_market(sig.signal_type.value, size)
+                if fill is None: continue
+                entry = fill
+            self.trade_counter +=1
             position = Position(
                 id=f"POS{self.trade_counter}",
                 strategy=sig.strategy,
                 signal_type=sig.signal_type,
-                entry=sig.entry,
+                entry=entry,
                 stop_loss=sig.stop_loss,
                 take_profit=sig.take_profit,
                 size=size,
-                entry_time=datetime.now()
+                entry_time=self.clock.now()
             )
             self.positions.append(position)
-            logger.info(f"📊 SIGNAL GENERATED: {sig.strategy} {sig.signal_type.value.upper()} | Entry: {sig.entry} | SL: {sig.stop_loss} | TP: {sig.take_profit} | Confidence: {sig.confidence}%")
+            self.mtm.open(position.id, position.strategy,
+                          1 if position.signal_type==TradeType.BUY else -1, position.entry, position.size)
+            logger.info(f"📊 SIGNAL GENERATED: {sig.strategy} {sig.signal_type.value.upper()} | Entry: {position.entry} | SL: {sig.stop_loss} | TP: {sig.take_profit} | Confidence: {sig.confidence}%")
 
     async def update_positions(self):
         current_price = await self.data_provider.get_live_price()
-        for pos in self.positions:
-            if pos.status=="closed": continue
+        open_positions = [pos for pos in self.positions if pos.status!="closed"]
+        if not open_positions:
+            self.mtm.mark(current_price, self.clock.now())
+            return
+        direction = np.array([1 if pos.signal_type==TradeType.BUY else -1 for pos in open_positions])
+        stop_loss = np.array([pos.stop_loss for pos in open_positions], dtype=float)
+        take_profit = np.array([pos.take_profit for pos in open_positions], dtype=float)
+        hits = sl_tp_hits(direction, stop_loss, take_profit, current_price)
+        for pos, hit in zip(open_positions, hits):
+            if hit==0: continue
+            exit_price = pos.take_profit if hit>0 else pos.stop_loss
             if pos.signal_type==TradeType.BUY:
-                if current_price>=pos.take_profit:
-                    pos.unrealized_pnl = (pos.take_profit - pos.entry)*pos.size
-                    pos.status="closed"
-                    self.account_balance += pos.unrealized_pnl
-                elif current_price<=pos.stop_loss:
-                    pos.unrealized_pnl = (pos.stop_loss - pos.entry)*pos.size
-                    pos.status="closed"
-                    self.account_balance += pos.unrealized_pnl
+                pos.realized_pnl = (exit_price - pos.entry)*pos.size
             else:
-                if current_price<=pos.take_profit:
-                    pos.unrealized_pnl = (pos.entry - pos.take_profit)*pos.size
-                    pos.status="closed"
-                    self.account_balance += pos.unrealized_pnl
-                elif current_price>=pos.stop_loss:
-                    pos.unrealized_pnl = (pos.entry - pos.stop_loss)*pos.size
-                    pos.status="closed"
-                    self.account_balance += pos.unrealized_pnl
+                pos.realized_pnl = (pos.entry - exit_price)*pos.size
+            pos.unrealized_pnl = 0.0
+            pos.status="closed"
+            self.account_balance += pos.realized_pnl
+            self.mtm.close(pos.id, pos.realized_pnl)
+        self.mtm.mark(current_price, self.clock.now())
+        for pos in open_positions:
+            if pos.status!="closed":
+                pos.unrealized_pnl = self.mtm.unrealized_pnl(pos.id)
+
+    async def run_cycle(self):
+        # SL/TP first so slow strategies can never delay exits
+        await self.update_positions()
+        signals = await self.generate_signals()
+        await self.execute_signals(signals)
 
     async def run(self):
-        while True:
-            signals = await self.generate_signals()
-            await self.execute_signals(signals)
-            await self.update_positions()
-            await asyncio.sleep(5)
+        self.loop_monitor.start()
+        try:
+            while not getattr(self.data_provider, "exhausted", False):
+                await self.run_cycle()
+                await self.clock.sleep(5)
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self):
+        await self.loop_monitor.stop()
+        self.offloader.shutdown()
+        misses = {name: r["deadline_misses"] for name, r in self.scheduler.report().items() if r["deadline_misses"]}
+        if misses: logger.warning(f"⏱️ Strategy deadline misses: {misses}")
+        lag = self.loop_monitor.report()
+        if lag["samples"]:
+            logger.info(f"🩺 Event loop lag: max {lag['max_lag_ms']:.1f} ms | p99 {lag['p99_lag_ms']:.1f} ms | "
+                        f"{lag['over_threshold']} over {lag['threshold_ms']:.0f} ms")
 
 # === Main ===
-async def main():
+def profile_probes(system):
+    return {
+        "data_rows": lambda: len(system.data_provider.data),
+        "data_bytes": lambda: system.data_provider.data.memory_usage(deep=True).sum(),
+        "positions": lambda: len(system.positions),
+    }
+
+async def main(args=None):
     system = DynamicTradingSystem()
-    await system.run()
+    if args is not None and args.profile:
+        await run_profiled(system.run(), session_from_args(args, "dynamic_trading_system6", profile_probes(system)),
+                           args.duration, args.report)
+    else:
+        await run_for(system.run(), args.duration if args is not None else None)
 
 if __name__=="__main__":
-    asyncio.run(main())
+    parser = add_profile_arguments(argparse.ArgumentParser(description="Dynamic trading system"))
+    asyncio.run(main(parser.parse_args()))
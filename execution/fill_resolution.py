@@ -0,0 +1,174 @@
+# File: fill_resolution.py
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+TAKE_PROFIT = 1
+STOP_LOSS = -1
+OPEN = 0
+
+POLICIES = ("stop_first", "target_first", "nearest_open")
+
+@dataclass
+class FillResult:
+    exit_index: np.ndarray   # bar index of the exit, -1 while still open
+    outcome: np.ndarray      # TAKE_PROFIT, STOP_LOSS or OPEN
+    exit_price: np.ndarray   # NaN while still open
+    ambiguous: np.ndarray    # both levels inside the exit bar's range
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"exit_index": self.exit_index, "outcome": self.outcome,
+                             "exit_price": self.exit_price, "ambiguous": self.ambiguous})
+
+# === Lower-timeframe drill-down ===
+class DrillDown:
+    """Lower-timeframe bars used to settle bars where both SL and TP were touched.
+
+    ``bounds[i]`` is the [start, end) range of sub-bars inside bar ``i``.
+    """
+
+    def __init__(self, high, low, open_, bounds):
+        self.high = np.asarray(high, dtype=float)
+        self.low = np.asarray(low, dtype=float)
+        self.open = np.asarray(open_, dtype=float)
+        self.bounds = np.asarray(bounds, dtype=np.int64)
+
+    @classmethod
+    def from_timestamps(cls, bar_times, sub_times, high, low, open_) -> "DrillDown":
+        bar_times = np.asarray(bar_times, dtype='datetime64[ns]')
+        sub_times = np.asarray(sub_times, dtype='datetime64[ns]')
+        starts = np.searchsorted(sub_times, bar_times, side='left')
+        ends = np.append(starts[1:], len(sub_times))
+        return cls(high, low, open_, np.stack([starts, ends], axis=1))
+
+# === First-touch scan ===
+def _scan(high, low, start, end, buy, stop_loss, take_profit, window: int, max_cells: int):
+    """First bar in [start, end) where either level is touched, per position.
+
+    Positions are scanned over a window of bars as one 2-D mask, and only those
+    with no touch move on to the next, doubling window; work is proportional
+    to the bars actually held. Returns (bar index or -1, sl hit, tp hit).
+    """
+    n = len(start)
+    first = np.full(n, -1, dtype=np.int64)
+    sl_at = np.zeros(n, dtype=bool)
+    tp_at = np.zeros(n, dtype=bool)
+    pending = np.flatnonzero(start < end)
+    offset = 0
+    while len(pending):
+        rows = max(1, max_cells // window)
+        still = []
+        for b in range(0, len(pending), rows):
+            p = pending[b:b + rows]
+            idx = start[p, None] + offset + np.arange(window)
+            valid = idx < end[p, None]
+            idx = np.minimum(idx, len(high) - 1)
+            hi, lo = high[idx], low[idx]
+            is_buy = buy[p, None]
+            sl = np.where(is_buy, lo <= stop_loss[p, None], hi >= stop_loss[p, None]) & valid
+            tp = np.where(is_buy, hi >= take_profit[p, None], lo <= take_profit[p, None]) & valid
+            touched = sl | tp
+            hit = touched.any(axis=1)
+            col = touched.argmax(axis=1)
+            r = np.flatnonzero(hit)
+            first[p[r]] = start[p[r]] + offset + col[r]
+            sl_at[p[r]] = sl[r, col[r]]
+            tp_at[p[r]] = tp[r, col[r]]
+            left = p[~hit]
+            still.append(left[start[left] + offset + window < end[left]])
+        pending = np.concatenate(still)
+        offset += window
+        window *= 2
+    return first, sl_at, tp_at
+
+
+def resolve_fills(high, low, start, direction, stop_loss, take_profit, open_=None, end=None,
+                  policy: str = "stop_first", drill_down: Optional[DrillDown] = None,
+                  gaps: bool = False, window: int = 64, max_cells: int = 4_000_000) -> FillResult:
+    """Finds, for every position, the first bar where its SL or TP is touched.
+
+    ``start`` is the first bar each position is exposed to (the bar after
+    entry), ``direction`` is +1 for buys and -1 for sells and ``end``
+    (exclusive) optionally caps the search. When both levels fall inside one
+    bar the drill-down bars decide if given; otherwise ``policy`` does:
+    ``stop_first`` (conservative), ``target_first``, or ``nearest_open``
+    (the level nearer the bar's open is assumed hit first). Fills are at the
+    level like ``update_positions``; with ``gaps=True`` a bar that opens
+    beyond the level fills at the open instead.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown ambiguity policy: {policy}")
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    start = np.asarray(start, dtype=np.int64)
+    buy = np.asarray(direction) > 0
+    stop_loss = np.asarray(stop_loss, dtype=float)
+    take_profit = np.asarray(take_profit, dtype=float)
+    end = np.full(len(start), len(high), dtype=np.int64) if end is None else \
+        np.minimum(np.asarray(end, dtype=np.int64), len(high))
+    if open_ is not None:
+        open_ = np.asarray(open_, dtype=float)
+    if policy == "nearest_open" and open_ is None:
+        raise ValueError("nearest_open policy needs bar opens")
+
+    first, sl_at, tp_at = _scan(high, low, start, end, buy, stop_loss, take_profit, window, max_cells)
+    hit = first >= 0
+    ambiguous = sl_at & tp_at
+    outcome = np.where(tp_at, TAKE_PROFIT, np.where(sl_at, STOP_LOSS, OPEN)).astype(np.int8)
+
+    amb = np.flatnonzero(ambiguous)
+    if len(amb):
+        settled = np.zeros(len(amb), dtype=bool)
+        if drill_down is not None:
+            bars = first[amb]
+            sub = resolve_fills(drill_down.high, drill_down.low, drill_down.bounds[bars, 0], buy[amb].astype(int) * 2 - 1,
+                                stop_loss[amb], take_profit[amb], open_=drill_down.open,
+                                end=drill_down.bounds[bars, 1], policy=policy, gaps=gaps)
+            settled = (sub.outcome != OPEN) & ~sub.ambiguous
+            outcome[amb[settled]] = sub.outcome[settled]
+        rest = amb[~settled]
+        if policy == "stop_first":
+            outcome[rest] = STOP_LOSS
+        elif policy == "target_first":
+            outcome[rest] = TAKE_PROFIT
+        else:
+            o = open_[first[rest]]
+            closer_sl = np.abs(o - stop_loss[rest]) <= np.abs(take_profit[rest] - o)
+            outcome[rest] = np.where(closer_sl, STOP_LOSS, TAKE_PROFIT)
+
+    exit_price = np.where(outcome == TAKE_PROFIT, take_profit, np.where(outcome == STOP_LOSS, stop_loss, np.nan))
+    if gaps and open_ is not None and hit.any():
+        o = np.full(len(start), np.nan)
+        o[hit] = open_[first[hit]]
+        level = exit_price
+        beyond = np.where(outcome == STOP_LOSS,
+                          np.where(buy, o <= level, o >= level),
+                          np.where(buy, o >= level, o <= level)) & (outcome != OPEN)
+        exit_price = np.where(beyond, o, exit_price)
+
+    return FillResult(np.where(hit, first, -1), outcome, exit_price, ambiguous)
+
+
+def resolve_positions(positions, bars: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """``resolve_fills`` for ``Position`` objects against a bar DataFrame.
+
+    Each position is checked from the first bar after its ``entry_time``.
+    """
+    times = pd.to_datetime(bars['timestamp']).to_numpy(dtype='datetime64[ns]')
+    entry = pd.to_datetime([p.entry_time for p in positions]).to_numpy(dtype='datetime64[ns]')
+    start = np.searchsorted(times, entry, side='right')
+    direction = np.array([1 if getattr(p.signal_type, "value", p.signal_type) == "buy" else -1 for p in positions])
+    result = resolve_fills(bars['high'].to_numpy(), bars['low'].to_numpy(), start, direction,
+                           [p.stop_loss for p in positions], [p.take_profit for p in positions],
+                           open_=bars['open'].to_numpy() if 'open' in bars else None, **kwargs)
+    frame = result.to_frame()
+    frame.insert(0, 'id', [p.id for p in positions])
+    hit = result.exit_index >= 0
+    frame['exit_time'] = pd.NaT
+    frame.loc[hit, 'exit_time'] = pd.to_datetime(times[result.exit_index[hit]])
+    sign = np.where(direction > 0, 1.0, -1.0)
+    frame['pnl'] = sign * (result.exit_price - np.array([p.entry for p in positions])) * \
+        np.array([p.size for p in positions])
+    return frame
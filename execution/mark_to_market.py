@@ -0,0 +1,141 @@
+# File: mark_to_market.py
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# === Bounded equity history ===
+class EquityBuffer:
+    """Fixed-size equity history that downsamples itself as it fills.
+
+    Every ``stride``-th sample is stored; when the buffer is full every other
+    stored sample is dropped and the stride doubles, so memory stays at
+    ``capacity`` points while still covering the whole run.
+    """
+
+    def __init__(self, capacity: int = 2048):
+        self.capacity = capacity - capacity % 2
+        self.times = np.empty(self.capacity, dtype='datetime64[ns]')
+        self.values = np.empty(self.capacity)
+        self.stride = 1
+        self._n = 0
+        self._seen = 0
+
+    def append(self, ts: datetime, value: float):
+        self._seen += 1
+        if (self._seen - 1) % self.stride:
+            return
+        if self._n == self.capacity:
+            half = self.capacity // 2
+            self.times[:half] = self.times[0::2]
+            self.values[:half] = self.values[0::2]
+            self._n = half
+            self.stride *= 2
+            if (self._seen - 1) % self.stride:
+                return
+        self.times[self._n] = np.datetime64(ts, 'ns')
+        self.values[self._n] = value
+        self._n += 1
+
+    def __len__(self):
+        return self._n
+
+    def series(self):
+        return self.times[:self._n].copy(), self.values[:self._n].copy()
+
+# === Mark-to-market ===
+class MarkToMarket:
+    """Vectorized unrealized PnL, equity and drawdown for all open positions.
+
+    Open positions live in parallel NumPy arrays (closed ones are swap-removed),
+    so each price update is one array expression plus a ``bincount`` for the
+    per-strategy totals.
+    """
+
+    def __init__(self, balance: float, capacity: int = 256, history: int = 2048):
+        self.balance = float(balance)
+        self.ids: List[str] = []
+        self._slot: Dict[str, int] = {}
+        self.direction = np.zeros(capacity)
+        self.entry = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.strategy = np.zeros(capacity, dtype=np.int64)
+        self.unrealized = np.zeros(capacity)
+        self.strategies: Dict[str, int] = {}
+        self.realized_by_strategy = np.zeros(0)
+        self.unrealized_by_strategy = np.zeros(0)
+        self.equity = self.balance
+        self.peak = self.balance
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.last_price: Optional[float] = None
+        self.history = EquityBuffer(history)
+
+    def _strategy_index(self, name: str) -> int:
+        idx = self.strategies.get(name)
+        if idx is None:
+            idx = self.strategies[name] = len(self.strategies)
+            self.realized_by_strategy = np.append(self.realized_by_strategy, 0.0)
+            self.unrealized_by_strategy = np.append(self.unrealized_by_strategy, 0.0)
+        return idx
+
+    def _grow(self):
+        for name in ("direction", "entry", "size", "strategy", "unrealized"):
+            arr = getattr(self, name)
+            setattr(self, name, np.concatenate([arr, np.zeros_like(arr)]))
+
+    def open(self, pos_id: str, strategy: str, direction: int, entry: float, size: float):
+        n = len(self.ids)
+        if n == len(self.entry):
+            self._grow()
+        self.ids.append(pos_id)
+        self._slot[pos_id] = n
+        self.direction[n] = direction
+        self.entry[n] = entry
+        self.size[n] = size
+        self.strategy[n] = self._strategy_index(strategy)
+        self.unrealized[n] = direction * ((self.last_price or entry) - entry) * size
+
+    def close(self, pos_id: str, realized_pnl: float):
+        i = self._slot.pop(pos_id)
+        last = len(self.ids) - 1
+        self.realized_by_strategy[self.strategy[i]] += realized_pnl
+        self.balance += realized_pnl
+        if i != last:
+            moved = self.ids[last]
+            self.ids[i] = moved
+            self._slot[moved] = i
+            for arr in (self.direction, self.entry, self.size, self.strategy, self.unrealized):
+                arr[i] = arr[last]
+        self.ids.pop()
+
+    def mark(self, price: float, ts: datetime) -> float:
+        n = len(self.ids)
+        self.last_price = price
+        u = self.unrealized[:n]
+        np.subtract(price, self.entry[:n], out=u)
+        u *= self.direction[:n]
+        u *= self.size[:n]
+        self.unrealized_by_strategy = np.bincount(self.strategy[:n], weights=u,
+                                                  minlength=len(self.strategies))
+        self.equity = self.balance + u.sum()
+        if self.equity > self.peak:
+            self.peak = self.equity
+        self.drawdown = (self.peak - self.equity) / self.peak if self.peak > 0 else 0.0
+        if self.drawdown > self.max_drawdown:
+            self.max_drawdown = self.drawdown
+        self.history.append(ts, self.equity)
+        return self.equity
+
+    def unrealized_pnl(self, pos_id: str) -> float:
+        return float(self.unrealized[self._slot[pos_id]])
+
+    def strategy_pnl(self) -> Dict[str, dict]:
+        return {name: {"realized": float(self.realized_by_strategy[i]),
+                       "unrealized": float(self.unrealized_by_strategy[i])}
+                for name, i in self.strategies.items()}
+
+    def snapshot(self) -> dict:
+        return {"balance": self.balance, "equity": self.equity, "peak": self.peak,
+                "drawdown": self.drawdown, "max_drawdown": self.max_drawdown,
+                "open_positions": len(self.ids), "strategies": self.strategy_pnl()}
@@ -0,0 +1,483 @@
+# File: simulated_exchange.py
+import asyncio
+import heapq
+import itertools
+import logging
+import multiprocessing as mp
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.clock import VirtualClock
+
+logger = logging.getLogger(__name__)
+
+BUY = 1
+SELL = -1
+
+# === Orders ===
+class Order:
+    __slots__ = ("id", "side", "price", "qty")
+
+    def __init__(self, order_id: int, side: int, price: int, qty: float):
+        self.id = order_id
+        self.side = side
+        self.price = price  # integer ticks
+        self.qty = qty
+
+
+def side_of(side) -> int:
+    """Accepts BUY/SELL ints, "buy"/"sell" strings or TradeType members."""
+    if isinstance(side, int):
+        return side
+    value = getattr(side, "value", side)
+    return BUY if str(value).lower() == "buy" else SELL
+
+# === Limit Order Book ===
+class OrderBook:
+    """Price-time priority book.
+
+    Prices are stored as integer ticks. Each side keeps a dict of price level
+    -> FIFO deque plus a heap of level prices; heap entries for levels that
+    have emptied out are discarded lazily.
+    """
+
+    def __init__(self, tick_size: float = 0.00001):
+        self.tick_size = tick_size
+        self.bids: Dict[int, deque] = {}
+        self.asks: Dict[int, deque] = {}
+        self._bid_heap: List[int] = []  # negated prices
+        self._ask_heap: List[int] = []
+        self.orders: Dict[int, Order] = {}
+        self._ids = itertools.count(1)
+        self.trade_count = 0
+        self.traded_volume = 0.0
+        self.last_trade_price: Optional[float] = None
+
+    def to_ticks(self, price: float) -> int:
+        return int(round(price / self.tick_size))
+
+    def to_price(self, ticks: int) -> float:
+        return ticks * self.tick_size
+
+    def best_bid(self) -> Optional[float]:
+        heap, levels = self._bid_heap, self.bids
+        while heap and -heap[0] not in levels:
+            heapq.heappop(heap)
+        return self.to_price(-heap[0]) if heap else None
+
+    def best_ask(self) -> Optional[float]:
+        heap, levels = self._ask_heap, self.asks
+        while heap and heap[0] not in levels:
+            heapq.heappop(heap)
+        return self.to_price(heap[0]) if heap else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return bid if ask is None else ask
+        return (bid + ask) / 2
+
+    def depth(self, side, levels: int = 5) -> List[Tuple[float, float]]:
+        book = self.bids if side_of(side) == BUY else self.asks
+        prices = sorted(book, reverse=side_of(side) == BUY)[:levels]
+        return [(self.to_price(p), sum(o.qty for o in book[p])) for p in prices]
+
+    def submit_limit(self, side, price: float, qty: float) -> Tuple[int, List[tuple]]:
+        """Matches what crosses and rests the remainder. Returns (order_id, fills)."""
+        side = side_of(side)
+        ticks = self.to_ticks(price)
+        order_id = next(self._ids)
+        fills: List[tuple] = []
+        qty = self._match(order_id, side, qty, ticks, fills)
+        if qty > 0:
+            order = Order(order_id, side, ticks, qty)
+            self.orders[order_id] = order
+            if side == BUY:
+                level = self.bids.get(ticks)
+                if level is None:
+                    level = self.bids[ticks] = deque()
+                    heapq.heappush(self._bid_heap, -ticks)
+            else:
+                level = self.asks.get(ticks)
+                if level is None:
+                    level = self.asks[ticks] = deque()
+                    heapq.heappush(self._ask_heap, ticks)
+            level.append(order)
+        return order_id, fills
+
+    def submit_market(self, side, qty: float) -> List[tuple]:
+        """Sweeps the opposite side; any unfilled remainder is dropped."""
+        side = side_of(side)
+        fills: List[tuple] = []
+        self._match(next(self._ids), side, qty, None, fills)
+        return fills
+
+    def cancel(self, order_id: int) -> bool:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        order.qty = 0.0
+        book = self.bids if order.side == BUY else self.asks
+        level = book[order.price]
+        level.remove(order)
+        if not level:
+            del book[order.price]  # heap entry is dropped lazily
+        return True
+
+    def _match(self, taker_id: int, side: int, qty: float, limit: Optional[int], fills: List[tuple]) -> float:
+        if side == BUY:
+            heap, book, sign = self._ask_heap, self.asks, 1
+        else:
+            heap, book, sign = self._bid_heap, self.bids, -1
+        orders = self.orders
+        while qty > 0 and heap:
+            ticks = heap[0] * sign
+            level = book.get(ticks)
+            if level is None:
+                heapq.heappop(heap)
+                continue
+            if limit is not None and (ticks > limit if side == BUY else ticks < limit):
+                break
+            price = self.to_price(ticks)
+            while qty > 0 and level:
+                maker = level[0]
+                traded = maker.qty if maker.qty < qty else qty
+                maker.qty -= traded
+                qty -= traded
+                fills.append((taker_id, maker.id, price, traded))
+                self.trade_count += 1
+                self.traded_volume += traded
+                if maker.qty <= 0.0:
+                    maker.qty = 0.0
+                    level.popleft()
+                    orders.pop(maker.id, None)
+            if not level:
+                del book[ticks]
+                heapq.heappop(heap)
+        if fills:
+            self.last_trade_price = fills[-1][2]
+        return qty
+
+# === Synthetic liquidity and price process ===
+class SyntheticLiquidity:
+    """Random-walk fair value with a market maker quoting a ladder around it.
+
+    The walk uses the same step size as ``MarketDataProvider.get_live_price``.
+    """
+
+    def __init__(self, book: OrderBook, start_price: float = 1.2000, volatility: float = 0.0005,
+                 spread_ticks: int = 2, levels: int = 5, level_size: float = 10_000.0,
+                 seed: Optional[int] = None):
+        self.book = book
+        self.fair_value = start_price
+        self.volatility = volatility
+        self.spread_ticks = spread_ticks
+        self.levels = levels
+        self.level_size = level_size
+        self.rng = np.random.default_rng(seed)
+        self._quote_ids: List[int] = []
+
+    def step(self) -> float:
+        self.fair_value += self.rng.normal(0, self.volatility)
+        self.requote()
+        return self.fair_value
+
+    def requote(self):
+        book = self.book
+        for order_id in self._quote_ids:
+            book.cancel(order_id)
+        self._quote_ids = []
+        center = book.to_ticks(self.fair_value)
+        half = max(1, self.spread_ticks // 2)
+        for i in range(self.levels):
+            bid_id, _ = book.submit_limit(BUY, book.to_price(center - half - i), self.level_size)
+            ask_id, _ = book.submit_limit(SELL, book.to_price(center + half + i), self.level_size)
+            self._quote_ids.extend((bid_id, ask_id))
+
+# === Exchange facade ===
+class SimulatedExchange:
+    """In-process counterparty with configurable latency and slippage.
+
+    ``latency_ms``/``latency_jitter_ms`` delay order arrival; ``slippage_bps``
+    is applied adversely on top of whatever the book walk produces.
+    """
+
+    def __init__(self, symbol: str = "EURUSD", start_price: float = 1.2000, tick_size: float = 0.00001,
+                 latency_ms: float = 0.0, latency_jitter_ms: float = 0.0, slippage_bps: float = 0.0,
+                 seed: Optional[int] = None, **liquidity_kwargs):
+        self.symbol = symbol
+        self.book = OrderBook(tick_size)
+        self.liquidity = SyntheticLiquidity(self.book, start_price, seed=seed, **liquidity_kwargs)
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.slippage_bps = slippage_bps
+        self.rng = np.random.default_rng(seed)
+        self.orders_received = 0
+        self.liquidity.requote()
+
+    def sample_latency(self) -> float:
+        if self.latency_jitter_ms:
+            jitter = abs(self.rng.normal(0, self.latency_jitter_ms))
+        else:
+            jitter = 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    def step(self) -> float:
+        return self.liquidity.step()
+
+    def quote(self) -> Tuple[float, float]:
+        """(mid, cumulative traded volume): everything the market data provider reads."""
+        return self.book.mid(), self.book.traded_volume
+
+    def fill_price(self, side, fills: List[tuple]) -> Optional[float]:
+        qty = sum(f[3] for f in fills)
+        if qty == 0:
+            return None
+        vwap = sum(f[2] * f[3] for f in fills) / qty
+        return vwap * (1 + side_of(side) * self.slippage_bps / 10_000)
+
+    def submit_market(self, side, qty: float) -> Optional[float]:
+        self.orders_received += 1
+        return self.fill_price(side, self.book.submit_market(side, qty))
+
+    def submit_limit(self, side, price: float, qty: float) -> Tuple[int, List[tuple]]:
+        self.orders_received += 1
+        return self.book.submit_limit(side, price, qty)
+
+    async def execute_market(self, side, qty: float) -> Optional[float]:
+        delay = self.sample_latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.submit_market(side, qty)
+
+# === Drop-in replacement for MarketDataProvider ===
+class SimulatedMarketDataProvider:
+    """Same interface as ``MarketDataProvider`` but priced off the exchange book.
+
+    ``exchange`` is a ``SimulatedExchange`` or an ``ExchangeProcess``; only
+    ``step`` and ``quote`` are used, so the book can live in another process.
+
+    Bars are kept in a bounded deque and ``data`` is rebuilt only when asked
+    for, so a long load test does not grow a DataFrame per tick. Bars are
+    stamped from ``clock``, a ``VirtualClock`` the engine picks up, so signal
+    and position times line up with bar timestamps; a bar is at least
+    ``bar_interval`` after the previous one even if nobody sleeps on the clock.
+    """
+
+    def __init__(self, exchange: SimulatedExchange, max_bars: int = 5000, bar_interval: float = 5.0):
+        self.exchange = exchange
+        self.symbol = exchange.symbol
+        self.current_price, self._last_volume = exchange.quote()
+        self.bar_interval = bar_interval
+        self._bars = deque(maxlen=max_bars)
+        self._frame: Optional[pd.DataFrame] = None
+        self.clock = VirtualClock(start=datetime.now())
+        self._last_ts: Optional[datetime] = None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = pd.DataFrame(list(self._bars),
+                                       columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        return self._frame
+
+    def _next_ts(self) -> datetime:
+        ts = self.clock.now()
+        if self._last_ts is not None:
+            ts = max(ts, self._last_ts + timedelta(seconds=self.bar_interval))
+        self.clock.advance_to(ts)
+        self._last_ts = ts
+        return ts
+
+    def _append(self, ts, o, h, l, c, v):
+        self._bars.append((ts, o, h, l, c, v))
+        self._frame = None
+
+    async def get_live_price(self) -> float:
+        self.exchange.step()
+        price, traded = self.exchange.quote()
+        self.current_price = price
+        # volume traded since the previous bar, not the book's running total
+        volume, self._last_volume = traded - self._last_volume, traded
+        self._append(self._next_ts(), price, price, price, price, volume)
+        return round(price, 5)
+
+    def get_historical_data(self, periods=200):
+        while len(self._bars) < periods:
+            self.exchange.step()
+            price = self.exchange.quote()[0]
+            spread = abs(np.random.normal(0, 0.0003))
+            self._append(self._next_ts(), price, price + spread, price - spread, price,
+                         np.random.randint(500, 1500))
+        self.current_price, self._last_volume = self.exchange.quote()
+        return self.data.tail(periods)
+
+# === Separate-process mode ===
+def _serve(conn, config: dict):
+    exchange = SimulatedExchange(**config)
+    book = exchange.book
+    while True:
+        msg = conn.recv()
+        kind = msg[0]
+        if kind == "batch":
+            # (side, price or None, qty) tuples; None price is a market order
+            start = time.perf_counter()
+            trades = 0
+            for side, price, qty in msg[1]:
+                if price is None:
+                    trades += len(book.submit_market(side, qty))
+                else:
+                    trades += len(book.submit_limit(side, price, qty)[1])
+            conn.send((len(msg[1]), trades, time.perf_counter() - start))
+        elif kind == "market":
+            conn.send(exchange.submit_market(msg[1], msg[2]))
+        elif kind == "latency":
+            conn.send(exchange.sample_latency())
+        elif kind == "step":
+            conn.send(exchange.step())
+        elif kind == "quote":
+            conn.send(exchange.quote())
+        elif kind == "orders":
+            conn.send(exchange.orders_received)
+        elif kind == "stop":
+            conn.close()
+            return
+
+
+class ExchangeProcess:
+    """Runs a ``SimulatedExchange`` in its own process, driven over a pipe.
+
+    It has the exchange calls the engine and ``SimulatedMarketDataProvider``
+    use (``execute_market``, ``step``, ``quote``), so either can run against
+    the out-of-process book. Each request is one send and one receive with no
+    await in between, so calls from the event loop never interleave.
+    """
+
+    def __init__(self, **config):
+        self.config = config
+        self.symbol = config.get("symbol", "EURUSD")
+        self._conn = None
+        self._proc = None
+
+    def start(self):
+        parent, child = mp.Pipe()
+        self._proc = mp.Process(target=_serve, args=(child, self.config), daemon=True)
+        self._proc.start()
+        self._conn = parent
+        return self
+
+    def submit_batch(self, orders: List[tuple]) -> tuple:
+        self._conn.send(("batch", orders))
+        return self._conn.recv()
+
+    def submit_market(self, side, qty: float) -> Optional[float]:
+        self._conn.send(("market", side_of(side), qty))
+        return self._conn.recv()
+
+    async def execute_market(self, side, qty: float) -> Optional[float]:
+        self._conn.send(("latency",))
+        delay = self._conn.recv()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.submit_market(side, qty)
+
+    def step(self) -> float:
+        self._conn.send(("step",))
+        return self._conn.recv()
+
+    def quote(self) -> Tuple[float, float]:
+        self._conn.send(("quote",))
+        return self._conn.recv()
+
+    @property
+    def orders_received(self) -> int:
+        self._conn.send(("orders",))
+        return self._conn.recv()
+
+    def stop(self):
+        if self._proc is not None:
+            self._conn.send(("stop",))
+            self._proc.join(timeout=5)
+            self._proc = None
+
+# === Throughput measurement ===
+def random_order_flow(n: int, mid: float = 1.2000, tick_size: float = 0.00001,
+                      market_ratio: float = 0.1, seed: Optional[int] = None) -> List[tuple]:
+    rng = np.random.default_rng(seed)
+    sides = np.where(rng.random(n) < 0.5, BUY, SELL)
+    offsets = rng.integers(-20, 21, n) * tick_size
+    qtys = rng.integers(1, 100, n).astype(float)
+    is_market = rng.random(n) < market_ratio
+    return [(int(s), None if m else round(mid + o, 5), float(q))
+            for s, o, q, m in zip(sides, offsets, qtys, is_market)]
+
+
+def benchmark_book(n_orders: int = 500_000, seed: Optional[int] = 0) -> dict:
+    book = OrderBook()
+    flow = random_order_flow(n_orders, seed=seed)
+    submit_limit, submit_market = book.submit_limit, book.submit_market
+    start = time.perf_counter()
+    for side, price, qty in flow:
+        if price is None:
+            submit_market(side, qty)
+        else:
+            submit_limit(side, price, qty)
+    elapsed = time.perf_counter() - start
+    return {"orders": n_orders, "trades": book.trade_count, "seconds": elapsed,
+            "orders_per_sec": n_orders / elapsed}
+
+
+def benchmark_engine(cycles: int = 500, seed: Optional[int] = 0, process: bool = False, **exchange_kwargs) -> dict:
+    from dynamic_trading_system6 import DynamicTradingSystem
+
+    if process:
+        exchange = ExchangeProcess(seed=seed, **exchange_kwargs).start()
+    else:
+        exchange = SimulatedExchange(seed=seed, **exchange_kwargs)
+    system = DynamicTradingSystem(data_provider=SimulatedMarketDataProvider(exchange), exchange=exchange)
+
+    async def drive():
+        for _ in range(cycles):
+            await system.run_cycle()
+
+    start = time.perf_counter()
+    asyncio.run(drive())
+    elapsed = time.perf_counter() - start
+    system.offloader.shutdown()
+    orders = exchange.orders_received
+    if process:
+        exchange.stop()
+    return {"cycles": cycles, "positions": len(system.positions), "exchange_orders": orders,
+            "seconds": elapsed, "cycles_per_sec": cycles / elapsed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulated exchange load test")
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--cycles", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--process", action="store_true", help="run the book in a separate process")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s [%(asctime)s] %(message)s')
+
+    if args.process:
+        proc = ExchangeProcess().start()
+        n, trades, secs = proc.submit_batch(random_order_flow(args.orders, seed=0))
+        proc.stop()
+        book = {"orders": n, "trades": trades, "seconds": secs, "orders_per_sec": n / secs}
+    else:
+        book = benchmark_book(args.orders)
+    print(f"📈 Book: {book['orders']} orders, {book['trades']} trades in {book['seconds']:.2f}s "
+          f"({book['orders_per_sec']:,.0f} orders/s)")
+    engine = benchmark_engine(args.cycles, process=args.process, latency_ms=args.latency_ms,
+                              slippage_bps=args.slippage_bps)
+    print(f"⚙️ Engine: {engine['cycles']} cycles, {engine['positions']} positions in {engine['seconds']:.2f}s "
+          f"({engine['cycles_per_sec']:,.1f} cycles/s)")
@@ -0,0 +1,97 @@
+# File: strategy_scheduler.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from utils.offload import Offloader
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StrategyTask:
+    name: str
+    func: Callable
+    priority: int = 0        # lower runs (and gets a worker) first
+    deadline: float = 0.25   # seconds from the start of the cycle
+    runs: int = 0
+    completed: int = 0
+    deadline_misses: int = 0
+    stale_skips: int = 0
+    errors: int = 0
+    last_runtime: float = 0.0
+
+# === Strategy Scheduler ===
+class StrategyScheduler:
+    """Runs strategies concurrently with per-strategy deadlines.
+
+    Tasks are submitted to the executor in priority order. A result that
+    misses its deadline is dropped and counted. Work whose input bar is
+    already stale, either before it starts or by the time it finishes, is
+    skipped rather than traded on.
+    """
+
+    def __init__(self, is_stale: Optional[Callable[[object], bool]] = None,
+                 offloader: Optional[Offloader] = None, max_workers: int = 4):
+        self.tasks: Dict[str, StrategyTask] = {}
+        self.is_stale = is_stale or (lambda bar_time: False)
+        self._owns_offloader = offloader is None
+        self.offloader = offloader or Offloader(max_inflight=max_workers)
+
+    def add(self, name: str, func: Callable, priority: int = 0, deadline: float = 0.25) -> StrategyTask:
+        task = self.tasks[name] = StrategyTask(name, func, priority, deadline)
+        return task
+
+    def _timed(self, task: StrategyTask, args: tuple):
+        start = time.perf_counter()
+        try:
+            return task.func(*args)
+        finally:
+            task.last_runtime = time.perf_counter() - start
+
+    async def run(self, data, regime, weights: Dict[str, float], bar_time) -> List:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        running = []
+        for task in sorted(self.tasks.values(), key=lambda t: t.priority):
+            if self.is_stale(bar_time):
+                task.stale_skips += 1
+                continue
+            task.runs += 1
+            fut = self.offloader.submit(self._timed, task, (data, regime, weights[task.name]))
+            running.append((task, fut))
+
+        signals = []
+        for task, fut in running:
+            remaining = started + task.deadline - loop.time()
+            try:
+                sig = await asyncio.wait_for(asyncio.shield(fut), max(remaining, 0))
+            except asyncio.TimeoutError:
+                fut.cancel()  # frees a queued job; one already running finishes and is ignored
+                fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+                task.deadline_misses += 1
+                logger.warning(f"⏱️ {task.name} missed its {task.deadline * 1000:.0f} ms deadline")
+                continue
+            except Exception as exc:
+                task.errors += 1
+                logger.error(f"❌ {task.name} failed: {exc}")
+                continue
+            task.completed += 1
+            if sig is None:
+                continue
+            if self.is_stale(bar_time):
+                task.stale_skips += 1
+                continue
+            signals.append(sig)
+        return signals
+
+    def report(self) -> Dict[str, dict]:
+        return {name: {"runs": t.runs, "completed": t.completed, "deadline_misses": t.deadline_misses,
+                       "stale_skips": t.stale_skips, "errors": t.errors,
+                       "last_runtime_ms": t.last_runtime * 1000}
+                for name, t in self.tasks.items()}
+
+    def shutdown(self):
+        if self._owns_offloader:
+            self.offloader.shutdown()
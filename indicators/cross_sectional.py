@@ -0,0 +1,132 @@
+# File: cross_sectional.py
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Regime codes, index into REGIMES (values match MarketRegime)
+TRENDING, RANGING, VOLATILE = 0, 1, 2
+REGIMES = ("trending", "ranging", "volatile")
+
+# === Building the symbols x bars matrix ===
+def stack(frames: Dict[str, pd.DataFrame], columns: Iterable[str] = ('high', 'low', 'close'),
+          bars: Optional[int] = None) -> Tuple[list, Dict[str, np.ndarray], np.ndarray]:
+    """Stacks per-symbol DataFrames into right-aligned (symbols x bars) arrays.
+
+    Shorter histories are left-padded with NaN; the returned mask is True
+    where a bar exists. Only the last ``bars`` rows of each frame are used.
+    """
+    symbols = list(frames)
+    width = bars or max((len(f) for f in frames.values()), default=0)
+    out = {col: np.full((len(symbols), width), np.nan) for col in columns}
+    mask = np.zeros((len(symbols), width), dtype=bool)
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol].tail(width)
+        n = len(frame)
+        if not n:
+            continue
+        mask[row, width - n:] = True
+        for col in columns:
+            out[col][row, width - n:] = frame[col].to_numpy(dtype=float)
+    return symbols, out, mask
+
+
+def align_right(values: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Moves each row's valid bars to the end (order kept) and NaN-fills the rest."""
+    order = np.argsort(mask, axis=1, kind='stable')
+    aligned = np.take_along_axis(values, order, axis=1).astype(float)
+    aligned_mask = np.take_along_axis(mask, order, axis=1)
+    aligned[~aligned_mask] = np.nan
+    return aligned, aligned_mask
+
+
+def _prepare(mask: Optional[np.ndarray], *arrays):
+    if mask is None:
+        # without a mask a bar is valid where every input is a number
+        arrays = tuple(np.asarray(a, dtype=float) for a in arrays)
+        mask = np.all([~np.isnan(a) for a in arrays], axis=0)
+    return tuple(align_right(np.asarray(a, dtype=float), mask)[0] for a in arrays), \
+        np.sort(mask, axis=1)
+
+# === Indicators (one vectorized pass over all symbols) ===
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14,
+        mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Latest ATR per symbol; same values as ``TechnicalIndicators.calculate_atr``."""
+    (high, low, close), mask = _prepare(mask, high, low, close)
+    counts = mask.sum(axis=1)
+    out = np.full(len(close), np.nan)
+    if close.shape[1] <= period:
+        return out
+    h, l = high[:, -period:], low[:, -period:]
+    prev = close[:, -period - 1:-1]
+    tr = np.maximum(h - l, np.maximum(np.abs(h - prev), np.abs(l - prev)))
+    out = tr.mean(axis=1)
+    out[counts <= period] = np.nan
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Latest RSI per symbol; same values as ``TechnicalIndicators.calculate_rsi``."""
+    (close,), mask = _prepare(mask, close)
+    counts = mask.sum(axis=1)
+    out = np.full(len(close), np.nan)
+    if close.shape[1] < period:
+        return out
+    window = close[:, -period - 1:] if close.shape[1] > period else close
+    delta = np.diff(window, axis=1)[:, -period:]
+    delta = np.where(np.isnan(delta), 0.0, delta)  # pandas where() zeroes the first NaN diff
+    gain = np.where(delta > 0, delta, 0.0).sum(axis=1)
+    loss = np.where(delta < 0, -delta, 0.0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    out[(loss == 0) & (gain > 0)] = 100.0
+    out[counts < period] = np.nan
+    return out
+
+
+def volatility(close: np.ndarray, window: int = 50, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Std of simple returns over the last ``window`` closes (as in ``detect_market_regime``)."""
+    (close,), mask = _prepare(mask, close)
+    out = np.full(len(close), np.nan)
+    if close.shape[1] < window:
+        return out
+    prices = close[:, -window:]
+    returns = np.diff(prices, axis=1) / prices[:, :-1]
+    out = returns.std(axis=1)
+    out[mask.sum(axis=1) < window] = np.nan
+    return out
+
+
+def trend(close: np.ndarray, window: int = 50, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    (close,), mask = _prepare(mask, close)
+    out = np.full(len(close), np.nan)
+    if close.shape[1] < window:
+        return out
+    out = (close[:, -1] - close[:, -window]) / close[:, -window]
+    out[mask.sum(axis=1) < window] = np.nan
+    return out
+
+
+def regime(close: np.ndarray, window: int = 50, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Regime code per symbol (see ``REGIMES``); symbols with < ``window`` bars are TRENDING."""
+    vol = volatility(close, window, mask)
+    tr = np.abs(trend(close, window, mask))
+    codes = np.full(len(vol), VOLATILE, dtype=np.int8)
+    codes[(tr < 0.01) & (vol < 0.012)] = RANGING
+    codes[(tr > 0.02) & (vol < 0.015)] = TRENDING
+    codes[np.isnan(vol)] = TRENDING
+    return codes
+
+
+def scan(frames: Dict[str, pd.DataFrame], atr_period: int = 14, rsi_period: int = 14,
+         window: int = 50) -> pd.DataFrame:
+    """Universe-wide ATR, RSI, volatility and regime, one row per symbol."""
+    symbols, cols, mask = stack(frames, bars=max(window, atr_period + 1, rsi_period + 1))
+    high, low, close = cols['high'], cols['low'], cols['close']
+    codes = regime(close, window, mask)
+    return pd.DataFrame({
+        'atr': atr(high, low, close, atr_period, mask),
+        'rsi': rsi(close, rsi_period, mask),
+        'volatility': volatility(close, window, mask),
+        'regime': np.array(REGIMES)[codes],
+    }, index=symbols)
@@ -0,0 +1,170 @@
+# File: kernels.py
+import numpy as np
+import pandas as pd
+
+# Numba is optional: the loop kernels are JIT-compiled when it is installed,
+# otherwise the vectorized NumPy versions below are used.
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    njit = None
+    HAVE_NUMBA = False
+
+# === Loop kernels (single pass, no temporaries; compiled by Numba) ===
+def _true_range_loop(high, low, close):
+    n = len(close)
+    out = np.empty(n)
+    if n:
+        out[0] = np.nan  # matches close.shift() in TechnicalIndicators
+    for i in range(1, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        out[i] = max(hl, hc, lc)
+    return out
+
+
+def _rolling_mean_loop(values, period):
+    n = len(values)
+    out = np.full(n, np.nan)
+    total = 0.0
+    valid = 0
+    for i in range(n):
+        x = values[i]
+        if x == x:
+            total += x
+            valid += 1
+        if i >= period:
+            y = values[i - period]
+            if y == y:
+                total -= y
+                valid -= 1
+        if i >= period - 1 and valid == period:
+            out[i] = total / period
+    return out
+
+
+def _atr_last_loop(high, low, close, period):
+    n = len(close)
+    if n <= period:
+        return np.nan
+    total = 0.0
+    for i in range(n - period, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        total += max(hl, hc, lc)
+    return total / period
+
+
+def _rsi_last_loop(close, period):
+    # the first diff is NaN in pandas and where() turns it into a zero gain/loss
+    n = len(close)
+    if n < period:
+        return np.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(max(n - period, 1), n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        elif delta < 0:
+            loss -= delta
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    rs = gain / loss
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
+def _sl_tp_hits_loop(direction, stop_loss, take_profit, price):
+    # 1 = take profit, -1 = stop loss, 0 = still open; TP is checked first like update_positions
+    n = len(direction)
+    out = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        if direction[i] > 0:
+            if price >= take_profit[i]:
+                out[i] = 1
+            elif price <= stop_loss[i]:
+                out[i] = -1
+        else:
+            if price <= take_profit[i]:
+                out[i] = 1
+            elif price >= stop_loss[i]:
+                out[i] = -1
+    return out
+
+# === NumPy fallbacks ===
+def _true_range_numpy(high, low, close):
+    tr = np.empty(len(close))
+    if len(close):
+        tr[0] = np.nan
+        prev = close[:-1]
+        tr[1:] = np.maximum(high[1:] - low[1:],
+                            np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return tr
+
+
+def _rolling_mean_numpy(values, period):
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        out[period - 1:] = windows.mean(axis=1)
+    return out
+
+
+def _atr_last_numpy(high, low, close, period):
+    if len(close) <= period:
+        return np.nan
+    s = slice(len(close) - period, len(close))
+    prev = close[len(close) - period - 1:-1]
+    tr = np.maximum(high[s] - low[s], np.maximum(np.abs(high[s] - prev), np.abs(low[s] - prev)))
+    return tr.mean()
+
+
+def _rsi_last_numpy(close, period):
+    if len(close) < period:
+        return np.nan
+    delta = np.diff(close[max(len(close) - period - 1, 0):])
+    gain = delta[delta > 0].sum()
+    loss = -delta[delta < 0].sum()
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+def _sl_tp_hits_numpy(direction, stop_loss, take_profit, price):
+    buy = direction > 0
+    tp = np.where(buy, price >= take_profit, price <= take_profit)
+    sl = np.where(buy, price <= stop_loss, price >= stop_loss)
+    return np.where(tp, 1, np.where(sl, -1, 0)).astype(np.int8)
+
+# === Public kernels ===
+if HAVE_NUMBA:
+    true_range = njit(cache=True)(_true_range_loop)
+    rolling_mean = njit(cache=True)(_rolling_mean_loop)
+    atr_last = njit(cache=True)(_atr_last_loop)
+    rsi_last = njit(cache=True)(_rsi_last_loop)
+    sl_tp_hits = njit(cache=True)(_sl_tp_hits_loop)
+else:
+    true_range = _true_range_numpy
+    rolling_mean = _rolling_mean_numpy
+    atr_last = _atr_last_numpy
+    rsi_last = _rsi_last_numpy
+    sl_tp_hits = _sl_tp_hits_numpy
+
+
+def _column(data: pd.DataFrame, name: str) -> np.ndarray:
+    return np.ascontiguousarray(data[name].to_numpy(dtype=np.float64))
+
+# === Drop-in for TechnicalIndicators ===
+class KernelIndicators:
+    """Same signatures and results as ``TechnicalIndicators`` ATR/RSI, backed by the kernels."""
+
+    @staticmethod
+    def calculate_atr(data, period=14):
+        return atr_last(_column(data, 'high'), _column(data, 'low'), _column(data, 'close'), period)
+
+    @staticmethod
+    def calculate_rsi(data, period=14):
+        return rsi_last(_column(data, 'close'), period)
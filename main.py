@@ -1,7 +1,10 @@
+import argparse
+
 from strategies.example_strategy import run_strategy
 from execution.example_executor import execute_trade
 from dashboard.example_dashboard import show_dashboard
 from utils.helpers import log_message
+from utils.profiling import add_profile_arguments, session_from_args
 
 def main():
     log_message('MMM System Starting...')
@@ -11,4 +14,11 @@ def main():
     log_message('MMM System Finished.')
 
 if __name__ == '__main__':
-    main()
+    parser = add_profile_arguments(argparse.ArgumentParser(description='MMM System'), duration=False)
+    args = parser.parse_args()
+    if args.profile:
+        with session_from_args(args, 'main') as session:
+            main()
+        session.write_report(args.report)
+    else:
+        main()
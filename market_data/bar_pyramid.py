@@ -0,0 +1,196 @@
+# File: bar_pyramid.py
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.enums import MarketRegime
+
+DEFAULT_TIMEFRAMES: List[Tuple[str, int]] = [
+    ("1m", 60), ("5m", 300), ("15m", 900), ("1h", 3600), ("1d", 86400)
+]
+
+@dataclass
+class Bar:
+    start: float  # epoch seconds of the bucket start
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+# === Rolling statistics ===
+class RollingStats:
+    """O(1) per-bar statistics over the last ``window`` closed bars.
+
+    Return variance uses Welford's update with removal of the oldest sample,
+    trend compares the newest close to the oldest one in the window and range
+    uses monotonic deques for the rolling high/low. With the default window of
+    50 the numbers match ``detect_market_regime`` on the same closes.
+    """
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.closes = deque(maxlen=window)
+        self.returns = deque()
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._highs = deque()  # (index, high), decreasing
+        self._lows = deque()   # (index, low), increasing
+        self._index = 0
+
+    def _add_return(self, x: float):
+        self.returns.append(x)
+        self._n += 1
+        d = x - self._mean
+        self._mean += d / self._n
+        self._m2 += d * (x - self._mean)
+
+    def _remove_return(self):
+        x = self.returns.popleft()
+        self._n -= 1
+        if self._n == 0:
+            self._mean = self._m2 = 0.0
+            return
+        d = x - self._mean
+        self._mean -= d / self._n
+        self._m2 -= d * (x - self._mean)
+
+    def add(self, bar: Bar):
+        if self.closes:
+            prev = self.closes[-1]
+            self._add_return((bar.close - prev) / prev)
+            if self._n > self.window - 1:
+                self._remove_return()
+        self.closes.append(bar.close)
+
+        i = self._index
+        self._index += 1
+        while self._highs and self._highs[-1][1] <= bar.high:
+            self._highs.pop()
+        self._highs.append((i, bar.high))
+        while self._lows and self._lows[-1][1] >= bar.low:
+            self._lows.pop()
+        self._lows.append((i, bar.low))
+        expired = i - self.window
+        while self._highs[0][0] <= expired:
+            self._highs.popleft()
+        while self._lows[0][0] <= expired:
+            self._lows.popleft()
+
+    @property
+    def count(self) -> int:
+        return len(self.closes)
+
+    @property
+    def volatility(self) -> float:
+        return math.sqrt(max(self._m2, 0.0) / self._n) if self._n else 0.0
+
+    @property
+    def trend(self) -> float:
+        if not self.closes:
+            return 0.0
+        return (self.closes[-1] - self.closes[0]) / self.closes[0]
+
+    @property
+    def range(self) -> float:
+        if not self._highs:
+            return 0.0
+        return self._highs[0][1] - self._lows[0][1]
+
+    def regime(self) -> MarketRegime:
+        # same thresholds as TechnicalIndicators.detect_market_regime
+        if self.count < self.window:
+            return MarketRegime.TRENDING
+        trend, volatility = self.trend, self.volatility
+        if abs(trend) > 0.02 and volatility < 0.015:
+            return MarketRegime.TRENDING
+        elif abs(trend) < 0.01 and volatility < 0.012:
+            return MarketRegime.RANGING
+        else:
+            return MarketRegime.VOLATILE
+
+# === Timeframe level ===
+class TimeframeLevel:
+    def __init__(self, name: str, seconds: int, window: int = 50):
+        self.name = name
+        self.seconds = seconds
+        self.stats = RollingStats(window)
+        self.current: Optional[Bar] = None
+        self.last_closed: Optional[Bar] = None
+        self.parent: Optional["TimeframeLevel"] = None
+
+    def add(self, start: float, o: float, h: float, l: float, c: float, v: float):
+        bucket = start - start % self.seconds
+        bar = self.current
+        if bar is not None and bucket == bar.start:
+            if h > bar.high: bar.high = h
+            if l < bar.low: bar.low = l
+            bar.close = c
+            bar.volume += v
+            return
+        if bar is not None:
+            self._close(bar)
+        self.current = Bar(bucket, o, h, l, c, v)
+
+    def _close(self, bar: Bar):
+        self.last_closed = bar
+        self.stats.add(bar)
+        if self.parent is not None:
+            self.parent.add(bar.start, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+# === Bar pyramid ===
+class BarPyramid:
+    """Multi-timeframe bars rolled up incrementally from the lowest level.
+
+    Each tick or base bar touches the base level; a higher level is only
+    updated when the level below it closes a bar, so the per-update cost is
+    O(1) amortized and regime queries read precomputed statistics.
+    """
+
+    def __init__(self, timeframes: List[Tuple[str, int]] = None, window: int = 50):
+        timeframes = timeframes or DEFAULT_TIMEFRAMES
+        self.levels: Dict[str, TimeframeLevel] = {}
+        prev = None
+        for name, seconds in timeframes:
+            if prev is not None and seconds % prev.seconds:
+                raise ValueError(f"{name} is not a multiple of {prev.name}")
+            level = TimeframeLevel(name, seconds, window)
+            if prev is not None:
+                prev.parent = level
+            self.levels[name] = level
+            prev = level
+        self.base = next(iter(self.levels.values()))
+        self.last_timestamp = None
+
+    @staticmethod
+    def _epoch(ts) -> float:
+        return ts.timestamp() if isinstance(ts, datetime) else float(ts)
+
+    def update(self, ts, price: float, volume: float = 0.0):
+        self.base.add(self._epoch(ts), price, price, price, price, volume)
+
+    def add_bar(self, ts, o: float, h: float, l: float, c: float, v: float = 0.0):
+        self.base.add(self._epoch(ts), o, h, l, c, v)
+
+    def sync(self, data: pd.DataFrame) -> int:
+        """Feeds rows of ``data`` newer than the last bar seen, stamped with their own timestamps."""
+        if self.last_timestamp is not None:
+            data = data[data['timestamp'] > self.last_timestamp]
+        if not len(data):
+            return 0
+        volume = data['volume'] if 'volume' in data else [0.0] * len(data)
+        for row in zip(data['timestamp'], data['open'], data['high'], data['low'], data['close'], volume):
+            self.add_bar(*row)
+        self.last_timestamp = data['timestamp'].iloc[-1]
+        return len(data)
+
+    def stats(self, timeframe: str) -> RollingStats:
+        return self.levels[timeframe].stats
+
+    def regime(self, timeframe: str) -> MarketRegime:
+        return self.levels[timeframe].stats.regime()
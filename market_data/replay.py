@@ -0,0 +1,184 @@
+# File: replay.py
+import logging
+import os
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.clock import VirtualClock
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# === Chunked readers ===
+def _normalize(frame: pd.DataFrame, timestamp_col: str) -> Dict[str, np.ndarray]:
+    """Turns a bar or tick chunk into timestamp/open/high/low/close/volume arrays."""
+    ts = pd.to_datetime(frame[timestamp_col]).to_numpy(dtype='datetime64[ns]')
+    if 'close' in frame:
+        close = frame['close'].to_numpy(dtype=float)
+        cols = {name: frame[name].to_numpy(dtype=float) if name in frame else close
+                for name in ('open', 'high', 'low')}
+    else:
+        # tick data: one price per row, treated like MarketDataProvider's flat rows
+        close = frame['price'].to_numpy(dtype=float)
+        cols = {'open': close, 'high': close, 'low': close}
+    volume_col = 'volume' if 'volume' in frame else 'size' if 'size' in frame else None
+    volume = frame[volume_col].to_numpy(dtype=float) if volume_col else np.zeros(len(close))
+    return {'timestamp': ts, **cols, 'close': close, 'volume': volume}
+
+
+def _read_csv(path: str, chunk_size: int, timestamp_col: str) -> Iterator[Dict[str, np.ndarray]]:
+    for frame in pd.read_csv(path, chunksize=chunk_size):
+        yield _normalize(frame, timestamp_col)
+
+
+def _read_parquet(path: str, chunk_size: int, timestamp_col: str) -> Iterator[Dict[str, np.ndarray]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet replay requires pyarrow (pip install pyarrow)") from exc
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield _normalize(batch.to_pandas(), timestamp_col)
+
+
+def _read_memmap(path: str, chunk_size: int, timestamp_col: str) -> Iterator[Dict[str, np.ndarray]]:
+    # structured .npy array; timestamp field is datetime64 or int64 epoch nanoseconds
+    records = np.load(path, mmap_mode='r')
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        yield _normalize(pd.DataFrame({name: chunk[name] for name in chunk.dtype.names}), timestamp_col)
+
+
+READERS = {'.csv': _read_csv, '.parquet': _read_parquet, '.pq': _read_parquet, '.npy': _read_memmap}
+
+# === Replay Data Provider ===
+class ReplayDataProvider:
+    """Streams recorded ticks or bars through the ``MarketDataProvider`` interface.
+
+    Rows are released as the engine's clock passes their timestamps, so the
+    replay speed is set by the ``VirtualClock`` (``speed=1`` real time,
+    ``speed=N`` N x, ``speed=None`` as fast as possible). Files are read one
+    chunk at a time and only the last ``max_bars`` rows are kept.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None, chunk_size: int = 100_000,
+                 max_bars: int = 5000, timestamp_col: str = 'timestamp', symbol: str = "EURUSD"):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in READERS:
+            raise ValueError(f"Unsupported replay file type: {ext}")
+        self.symbol = symbol
+        self.clock = VirtualClock(speed=speed)
+        self.max_bars = max_bars
+        self.current_price = None
+        self.exhausted = False
+        self.rows_replayed = 0
+        self._chunks = READERS[ext](path, chunk_size, timestamp_col)
+        self._chunk: Optional[Dict[str, np.ndarray]] = None
+        self._pos = 0
+        # buffer is twice max_bars so trimming old rows is amortized
+        self._cap = 2 * max_bars
+        self._buf = {name: np.empty(self._cap, dtype='datetime64[ns]' if name == 'timestamp' else float)
+                     for name in COLUMNS}
+        self._len = 0
+        self._frame: Optional[pd.DataFrame] = None
+        if self._next_chunk():
+            self.clock.advance_to(pd.Timestamp(self._chunk['timestamp'][0]))
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = self._tail(self.max_bars)
+        return self._frame
+
+    def _tail(self, n: int) -> pd.DataFrame:
+        start = max(0, self._len - n)
+        return pd.DataFrame({name: self._buf[name][start:self._len] for name in COLUMNS}, copy=True)
+
+    def _next_chunk(self) -> bool:
+        for chunk in self._chunks:
+            if len(chunk['timestamp']):
+                self._chunk, self._pos = chunk, 0
+                return True
+        self._chunk = None
+        self.exhausted = True
+        return False
+
+    def _append(self, lo: int, hi: int):
+        k = hi - lo
+        if k >= self.max_bars:
+            lo, k, self._len = hi - self.max_bars, self.max_bars, 0
+        elif self._len + k > self._cap:
+            keep = self.max_bars - k
+            for arr in self._buf.values():
+                arr[:keep] = arr[self._len - keep:self._len]
+            self._len = keep
+        for name, arr in self._buf.items():
+            arr[self._len:self._len + k] = self._chunk[name][lo:hi]
+        self._len += k
+        self._frame = None
+        self.rows_replayed += k
+
+    def _consume_until(self, ts: np.datetime64):
+        while self._chunk is not None:
+            stamps = self._chunk['timestamp']
+            end = int(np.searchsorted(stamps, ts, side='right'))
+            if end > self._pos:
+                self._append(self._pos, end)
+                self._pos = end
+            if self._pos < len(stamps):
+                return
+            self._next_chunk()
+
+    def _consume_rows(self, n: int):
+        while n > 0 and self._chunk is not None:
+            end = min(len(self._chunk['timestamp']), self._pos + n)
+            self._append(self._pos, end)
+            n -= end - self._pos
+            self._pos = end
+            if self._pos >= len(self._chunk['timestamp']):
+                self._next_chunk()
+
+    async def get_live_price(self) -> float:
+        self._consume_until(np.datetime64(pd.Timestamp(self.clock.now()), 'ns'))
+        if self._len:
+            self.current_price = float(self._buf['close'][self._len - 1])
+        return round(self.current_price, 5) if self.current_price is not None else None
+
+    def get_historical_data(self, periods=200):
+        if self._len < periods:
+            # warm-up: pull rows forward and move the clock with them
+            self._consume_rows(periods - self._len)
+            if self._len:
+                self.clock.advance_to(pd.Timestamp(self._buf['timestamp'][self._len - 1]))
+                self.current_price = float(self._buf['close'][self._len - 1])
+        return self._tail(periods)
+
+# === Standalone replay ===
+async def replay(path: str, speed: Optional[float] = None, **kwargs):
+    from dynamic_trading_system6 import DynamicTradingSystem
+
+    provider = ReplayDataProvider(path, speed=speed, **kwargs)
+    system = DynamicTradingSystem(data_provider=provider)
+    start_virtual, start_wall = provider.clock.now(), time.perf_counter()
+    await system.run()
+    wall = time.perf_counter() - start_wall
+    logger.info(f"⏩ Replayed {provider.rows_replayed} rows covering {provider.clock.now() - start_virtual} "
+                f"in {wall:.1f}s | Balance: {system.account_balance:.2f} | Positions: {len(system.positions)}")
+    return system
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Replay recorded market data through the trading engine")
+    parser.add_argument("path", help="CSV, Parquet or structured .npy file")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="1 for real time, N for N x; omit to run as fast as possible")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s [%(asctime)s] %(message)s')
+    asyncio.run(replay(args.path, speed=args.speed, chunk_size=args.chunk_size))
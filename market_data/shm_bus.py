@@ -0,0 +1,323 @@
+# File: shm_bus.py
+import logging
+import multiprocessing as mp
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TICK = 0
+BAR = 1
+
+# 64-byte records: one cache line per slot
+RECORD = np.dtype([('seq', 'i8'), ('kind', 'i8'), ('ts', 'i8'), ('open', 'f8'),
+                   ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'f8')])
+HEADER_SLOTS = 8  # [0] = next sequence to be written, [1] = capacity
+HEADER_BYTES = HEADER_SLOTS * 8
+
+# === Shared-memory ring buffer ===
+class MarketDataBus:
+    """Single-writer, many-reader ring of ticks and bars in shared memory.
+
+    The writer marks a slot's ``seq`` as -1, fills it, stamps the real
+    ``seq`` and only then publishes ``seq + 1`` in the header, so readers
+    never take locks: they read up to the published sequence and afterwards
+    check every record's ``seq``, both the copied and the live one, to find
+    slots the writer lapped while they were reading (an overrun).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[1])
+        self.ring = np.ndarray((self.capacity,), dtype=RECORD, buffer=shm.buf, offset=HEADER_BYTES)
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, capacity: int = 1 << 16) -> "MarketDataBus":
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_BYTES + capacity * RECORD.itemsize)
+        header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[1] = capacity
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "MarketDataBus":
+        # readers must not register the segment with a resource tracker, or it
+        # gets unlinked from under the writer when a reader process exits
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def head(self) -> int:
+        return int(self.header[0])
+
+    # --- writer side ---
+    def publish(self, kind: int, ts, o: float, h: float, l: float, c: float, v: float = 0.0) -> int:
+        seq = int(self.header[0])
+        slot = self.ring[seq % self.capacity]
+        slot['seq'] = -1  # in progress
+        slot['kind'] = kind
+        slot['ts'] = _ns(ts)
+        slot['open'], slot['high'], slot['low'], slot['close'], slot['volume'] = o, h, l, c, v
+        slot['seq'] = seq
+        self.header[0] = seq + 1
+        return seq
+
+    def publish_tick(self, ts, price: float, volume: float = 0.0) -> int:
+        return self.publish(TICK, ts, price, price, price, price, volume)
+
+    def publish_bar(self, ts, o: float, h: float, l: float, c: float, v: float = 0.0) -> int:
+        return self.publish(BAR, ts, o, h, l, c, v)
+
+    def publish_frame(self, data: pd.DataFrame, kind: int = BAR) -> int:
+        """Vectorized publish of a block of bars (wraps around the ring as needed)."""
+        n = len(data)
+        start = int(self.header[0])
+        if n > self.capacity:
+            data = data.iloc[n - self.capacity:]
+            start += n - self.capacity
+            n = self.capacity
+        records = np.empty(n, dtype=RECORD)
+        records['seq'] = np.arange(start, start + n)
+        records['kind'] = kind
+        records['ts'] = pd.to_datetime(data['timestamp']).to_numpy(dtype='datetime64[ns]').view('i8')
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            records[col] = data[col].to_numpy(dtype=float)
+        idx = np.arange(start, start + n) % self.capacity
+        self.ring['seq'][idx] = -1
+        self.ring[idx] = records
+        self.header[0] = start + n
+        return start + n - 1
+
+    def close(self):
+        del self.ring, self.header
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# === Reader ===
+class BusReader:
+    """Cursor over a ``MarketDataBus``; each reader process keeps its own."""
+
+    def __init__(self, bus: MarketDataBus, from_start: bool = False):
+        self.bus = bus
+        self.next_seq = self._oldest(bus.head) if from_start else bus.head
+        self.lost = 0
+        self.overruns = 0
+        self._view = (0, 0)
+
+    def _oldest(self, head: int) -> int:
+        # the slot of seq head - capacity is the one the writer fills next
+        return max(0, head - self.bus.capacity + 1)
+
+    def _range(self):
+        head = self.bus.head
+        start = self.next_seq
+        oldest = self._oldest(head)
+        if start < oldest:
+            self.lost += oldest - start
+            self.overruns += 1
+            start = oldest
+        return start, head
+
+    def read(self, max_items: Optional[int] = None, copy: bool = True) -> np.ndarray:
+        """Returns records published since the last read.
+
+        With ``copy=False`` a contiguous range comes back as a view straight
+        into shared memory; call ``valid`` after processing it to make sure the
+        writer did not overwrite it meanwhile.
+        """
+        start, head = self._range()
+        if max_items is not None:
+            head = min(head, start + max_items)
+        if head <= start:
+            return self.bus.ring[:0]
+        cap = self.bus.capacity
+        lo, hi = start % cap, (head - 1) % cap + 1
+        self.next_seq = head
+        self._view = (start, head)
+        if lo < hi and not copy:
+            return self.bus.ring[lo:hi]
+        if lo < hi:
+            out = self.bus.ring[lo:hi].copy()
+        else:
+            out = np.concatenate([self.bus.ring[lo:], self.bus.ring[:hi]])
+        # drop anything the writer overwrote while we were copying
+        stale = self._stale(start, head, out['seq'])
+        if stale > 0:
+            self.lost += stale
+            self.overruns += 1
+            out = out[stale:]
+        return out
+
+    def _stale(self, start: int, head: int, copied: Optional[np.ndarray] = None) -> int:
+        """Length of the prefix of ``[start, head)`` the writer has started to overwrite.
+
+        A slot is intact only if both the copied ``seq`` and the one now in the
+        ring match; the writer laps slots in sequence order, so everything up
+        to the last mismatch is gone. ``publish_frame`` rewrites several slots
+        before it moves the header, so the header alone cannot tell.
+        """
+        expected = np.arange(start, head)
+        idx = expected % self.bus.capacity
+        bad = self.bus.ring['seq'][idx] != expected
+        if copied is not None:
+            bad |= copied != expected
+        stale = int(np.flatnonzero(bad)[-1]) + 1 if bad.any() else 0
+        return max(stale, min(self._oldest(self.bus.head) - start, head - start))
+
+    def valid(self) -> bool:
+        """True if the last zero-copy view has not been overwritten yet."""
+        start, head = self._view
+        return self._stale(start, head) == 0
+
+    def latest(self) -> Optional[np.void]:
+        head = self.bus.head
+        if head == 0:
+            return None
+        return self.bus.ring[(head - 1) % self.bus.capacity].copy()
+
+
+def _ns(ts) -> int:
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    return int(pd.Timestamp(ts).value)
+
+
+def to_frame(records: np.ndarray) -> pd.DataFrame:
+    frame = pd.DataFrame({col: records[col] for col in ('open', 'high', 'low', 'close', 'volume')})
+    frame.insert(0, 'timestamp', records['ts'].astype('datetime64[ns]'))
+    return frame
+
+# === Worker-side MarketDataProvider ===
+class BusDataProvider:
+    """``MarketDataProvider`` interface for strategy/risk workers reading the bus."""
+
+    def __init__(self, name: str, history: int = 1000, symbol: str = "EURUSD"):
+        self.symbol = symbol
+        self.bus = MarketDataBus.attach(name)
+        self.reader = BusReader(self.bus, from_start=True)
+        self.history = history
+        self.current_price = None
+        self._buf = np.empty(0, dtype=RECORD)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return to_frame(self._buf)
+
+    def poll(self):
+        records = self.reader.read()
+        if len(records):
+            self._buf = np.concatenate([self._buf, records])[-self.history:]
+            self.current_price = float(self._buf['close'][-1])
+        return len(records)
+
+    async def get_live_price(self) -> float:
+        self.poll()
+        return round(self.current_price, 5) if self.current_price is not None else None
+
+    def latest_timestamp(self) -> Optional[pd.Timestamp]:
+        """Timestamp of the newest record on the bus, read or not (does not move the cursor)."""
+        record = self.reader.latest()
+        return None if record is None else pd.Timestamp(int(record['ts']))
+
+    def get_historical_data(self, periods=200):
+        self.poll()
+        return to_frame(self._buf[-periods:])
+
+    def close(self):
+        del self.reader
+        self.bus.close()
+
+# === Feed process ===
+def _random_walk(batch: int, tick_ms: float = 100.0, price: float = 1.2000,
+                 seed: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Endless synthetic ticks, ``batch`` at a time; only the last price and time are kept."""
+    rng = np.random.default_rng(seed)
+    ts = np.datetime64(datetime.now(), 'ns')
+    step = np.timedelta64(int(tick_ms * 1e6), 'ns')
+    while True:
+        prices = price + np.cumsum(rng.normal(0, 0.0005, batch))
+        stamps = ts + step * np.arange(1, batch + 1)
+        price, ts = prices[-1], stamps[-1]
+        yield pd.DataFrame({'timestamp': stamps, 'open': prices, 'high': prices, 'low': prices,
+                            'close': prices, 'volume': rng.integers(1, 10, batch).astype(float)})
+
+
+def _replay_chunks(path: str, batch: int) -> Iterator[pd.DataFrame]:
+    from market_data.replay import READERS
+    for chunk in READERS[os.path.splitext(path)[1].lower()](path, batch, 'timestamp'):
+        yield pd.DataFrame(chunk)
+
+
+def _run_feed(name: str, interval: float, stop, path: Optional[str] = None, batch: int = 256):
+    # the source is bounded (a running random walk or a chunked file reader), so the
+    # feed process keeps constant memory; records carry the source rows' timestamps
+    bus = MarketDataBus.attach(name)
+    try:
+        source = _replay_chunks(path, batch) if path else _random_walk(batch)
+        for frame in source:
+            if stop.is_set():
+                break
+            bus.publish_frame(frame, kind=BAR if path else TICK)
+            if interval:
+                time.sleep(interval)
+    finally:
+        bus.close()
+
+
+class FeedProcess:
+    """Owns the bus segment and publishes into it from a child process.
+
+    The child replays ``path`` (any ``ReplayDataProvider`` file type) as bars
+    or, without one, streams a synthetic random walk as ticks, ``batch`` rows
+    per publish and ``interval`` seconds between publishes.
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 1 << 16, interval: float = 0.0,
+                 path: Optional[str] = None, batch: int = 256):
+        self.bus = MarketDataBus.create(name, capacity)
+        self.interval = interval
+        self.path = path
+        self.batch = batch
+        self._stop = mp.Event()
+        self._proc = None
+
+    @property
+    def name(self) -> str:
+        return self.bus.name
+
+    def start(self):
+        self._proc = mp.Process(target=_run_feed, args=(self.bus.name, self.interval, self._stop,
+                                                        self.path, self.batch), daemon=True)
+        self._proc.start()
+        return self
+
+    def stop(self):
+        if self._proc is not None:
+            self._stop.set()
+            self._proc.join(timeout=5)
+            self._proc = None
+        self.bus.close()
@@ -8,6 +8,11 @@ from typing import Optional
 import logging
 import asyncio
 
+try:
+    from strategies.patterns import BULLISH, PatternTracker
+except ModuleNotFoundError:  # run directly as strategies/liquidity_grab.py
+    from patterns import BULLISH, PatternTracker
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -81,13 +86,32 @@ def get_historical_data(periods=200) -> pd.DataFrame:
         })
     return pd.DataFrame(data)
 
+# Next simulated bar, appended to the rolling window
+def next_bar(data: pd.DataFrame, periods=200) -> pd.DataFrame:
+    last = data.iloc[-1]
+    price = last['close'] + np.random.normal(0, 0.0008)
+    bar = {
+        'timestamp': last['timestamp'] + pd.Timedelta(minutes=5),
+        'open': last['close'],
+        'high': max(last['close'], price) + abs(np.random.normal(0, 0.0003)),
+        'low': min(last['close'], price) - abs(np.random.normal(0, 0.0003)),
+        'close': price,
+        'volume': np.random.randint(500, 1500)
+    }
+    return pd.concat([data, pd.DataFrame([bar])], ignore_index=True).tail(periods)
+
 # Liquidity Grab Strategy
-def liquidity_grab(data: pd.DataFrame, regime: MarketRegime, weight: float) -> Optional[Signal]:
-    if np.random.random() > 0.2:  # 20% chance
+def liquidity_grab(data: pd.DataFrame, regime: MarketRegime, weight: float,
+                   tracker: Optional[PatternTracker] = None) -> Optional[Signal]:
+    # pass a long-lived tracker to update incrementally; otherwise the whole window is scanned
+    tracker = tracker or PatternTracker()
+    tracker.sync(data)
+    event = tracker.latest("sweep")
+    if event is None:
         return None
     current_price = data['close'].iloc[-1]
     atr = calculate_atr(data)
-    signal_type = TradeType.SELL if np.random.random() > 0.5 else TradeType.BUY
+    signal_type = TradeType.BUY if event.direction == BULLISH else TradeType.SELL
     if signal_type == TradeType.BUY:
         stop_loss = current_price - (atr * 1.5)
         take_profit = current_price + (atr * 3)
@@ -113,13 +137,15 @@ def liquidity_grab(data: pd.DataFrame, regime: MarketRegime, weight: float) -> O
 async def main():
     logger.info("🚀 Liquidity Grab Strategy Test Starting...")
     data = get_historical_data()
-    regime = detect_market_regime(data)
+    tracker = PatternTracker()
     while True:
-        signal = liquidity_grab(data, regime, weight=0.25)
+        regime = detect_market_regime(data)
+        signal = liquidity_grab(data, regime, weight=0.25, tracker=tracker)
         if signal:
             logger.info(f"📊 SIGNAL GENERATED: {signal.strategy} {signal.signal_type.value.upper()} | "
                         f"Entry: {signal.entry:.5f} | SL: {signal.stop_loss:.5f} | TP: {signal.take_profit:.5f} | "
                         f"Confidence: {signal.confidence:.1f}%")
+        data = next_bar(data)
         await asyncio.sleep(3)
 
 if __name__ == "__main__":
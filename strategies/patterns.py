@@ -0,0 +1,251 @@
+# File: patterns.py
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+import pandas as pd
+
+BULLISH = "bullish"
+BEARISH = "bearish"
+
+FIB_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+
+# Pattern dataclasses
+@dataclass
+class SwingPoint:
+    index: int
+    timestamp: object
+    price: float
+    kind: str  # "high" or "low"
+
+@dataclass
+class OrderBlock:
+    index: int
+    low: float
+    high: float
+    direction: str  # BULLISH blocks act as support, BEARISH as resistance
+    tested: bool = False
+
+@dataclass
+class PatternEvent:
+    kind: str       # "swing", "order_block", "order_block_retest", "bos", "sweep", "fib_zone"
+    direction: str
+    index: int
+    price: float
+    detail: Dict[str, float] = field(default_factory=dict)
+
+# === Rolling extremes (monotonic deque) ===
+class RollingExtreme:
+    """Rolling max (or min) over the last ``window`` values, amortized O(1) per push."""
+
+    def __init__(self, window: int, maximum: bool = True):
+        self.window = window
+        self.maximum = maximum
+        self._q: Deque = deque()  # (index, value), front is the current extreme
+
+    def push(self, index: int, value: float):
+        q = self._q
+        if self.maximum:
+            while q and q[-1][1] <= value:
+                q.pop()
+        else:
+            while q and q[-1][1] >= value:
+                q.pop()
+        q.append((index, value))
+        while q[0][0] <= index - self.window:
+            q.popleft()
+
+    @property
+    def index(self) -> int:
+        return self._q[0][0]
+
+    @property
+    def value(self) -> float:
+        return self._q[0][1]
+
+# === Swing detection ===
+class SwingDetector:
+    """Fractal swings: bar ``i`` is a swing high if its high is the highest of
+    bars ``i - strength .. i + strength``; confirmed ``strength`` bars later."""
+
+    def __init__(self, strength: int = 3):
+        self.strength = strength
+        window = 2 * strength + 1
+        self._highs = RollingExtreme(window, maximum=True)
+        self._lows = RollingExtreme(window, maximum=False)
+        self._times: Deque = deque(maxlen=window)
+        self.last_high: Optional[SwingPoint] = None
+        self.last_low: Optional[SwingPoint] = None
+
+    def update(self, index: int, ts, high: float, low: float) -> List[SwingPoint]:
+        self._highs.push(index, high)
+        self._lows.push(index, low)
+        self._times.append(ts)
+        center = index - self.strength
+        if center < self.strength:
+            return []
+        swings = []
+        ts_center = self._times[-1 - self.strength]
+        if self._highs.index == center:
+            self.last_high = SwingPoint(center, ts_center, self._highs.value, "high")
+            swings.append(self.last_high)
+        if self._lows.index == center:
+            self.last_low = SwingPoint(center, ts_center, self._lows.value, "low")
+            swings.append(self.last_low)
+        return swings
+
+# === Order blocks ===
+class OrderBlockTracker:
+    """Tracks the last opposite bar before an impulsive move as a supply/demand zone.
+
+    Moves are close-to-close, so bars with open == close (as produced by the
+    live providers) still qualify. At most ``max_blocks`` zones are kept and
+    a zone is dropped once price closes through it, so each bar costs O(1).
+    """
+
+    def __init__(self, impulse: float = 2.0, lookback: int = 20, max_blocks: int = 5):
+        self.impulse = impulse
+        self.lookback = lookback
+        self.blocks: Deque[OrderBlock] = deque(maxlen=max_blocks)
+        self._moves: Deque[float] = deque()
+        self._move_sum = 0.0
+        self._prev: Optional[tuple] = None  # (index, low, high, close, move)
+
+    def update(self, index: int, high: float, low: float, close: float) -> List[PatternEvent]:
+        events = []
+        prev = self._prev
+        move = close - prev[3] if prev is not None else 0.0
+        avg = self._move_sum / len(self._moves) if self._moves else 0.0
+
+        for block in list(self.blocks):
+            if block.direction == BULLISH:
+                if close < block.low:
+                    self.blocks.remove(block)
+                elif low <= block.high and close > block.high and not block.tested:
+                    block.tested = True
+                    events.append(PatternEvent("order_block_retest", BULLISH, index, close,
+                                               {"low": block.low, "high": block.high}))
+            else:
+                if close > block.high:
+                    self.blocks.remove(block)
+                elif high >= block.low and close < block.low and not block.tested:
+                    block.tested = True
+                    events.append(PatternEvent("order_block_retest", BEARISH, index, close,
+                                               {"low": block.low, "high": block.high}))
+
+        if prev is not None and avg > 0 and abs(move) > self.impulse * avg and prev[4] * move < 0:
+            direction = BULLISH if move > 0 else BEARISH
+            block = OrderBlock(prev[0], prev[1], prev[2], direction)
+            self.blocks.append(block)
+            events.append(PatternEvent("order_block", direction, index, close,
+                                       {"low": block.low, "high": block.high}))
+
+        if prev is not None:
+            self._moves.append(abs(move))
+            self._move_sum += abs(move)
+            if len(self._moves) > self.lookback:
+                self._move_sum -= self._moves.popleft()
+        self._prev = (index, low, high, close, move)
+        return events
+
+# === Pattern tracker ===
+class PatternTracker:
+    """Streams bars through swing, order-block, structure and Fibonacci logic.
+
+    Every ``update`` is amortized O(1); ``sync`` feeds only the rows of a
+    DataFrame newer than the last bar seen, so strategies can keep passing
+    the engine's rolling window.
+    """
+
+    def __init__(self, strength: int = 3, impulse: float = 2.0, max_blocks: int = 5,
+                 fib_zone: tuple = (0.5, 0.618)):
+        self.swings = SwingDetector(strength)
+        self.order_blocks = OrderBlockTracker(impulse, max_blocks=max_blocks)
+        self.fib_zone = fib_zone
+        self.index = -1
+        self.last_timestamp = None
+        self.bar_events: List[PatternEvent] = []  # events raised by the most recent bar
+        self.fib_levels: Dict[float, float] = {}
+        self.leg: Optional[str] = None  # BULLISH if the latest swing leg went low -> high
+        self._bos_high: Optional[int] = None  # swing index already broken
+        self._bos_low: Optional[int] = None
+        self._swept_high: Optional[int] = None
+        self._swept_low: Optional[int] = None
+        self._in_fib_zone = False
+
+    def update(self, ts, o: float, h: float, l: float, c: float) -> List[PatternEvent]:
+        self.index += 1
+        i = self.index
+        self.last_timestamp = ts
+        events = []
+
+        for swing in self.swings.update(i, ts, h, l):
+            events.append(PatternEvent("swing", BEARISH if swing.kind == "high" else BULLISH, swing.index,
+                                       swing.price))
+            self._update_fib()
+
+        events.extend(self.order_blocks.update(i, h, l, c))
+
+        high, low = self.swings.last_high, self.swings.last_low
+        # break of structure: close beyond the latest confirmed swing, once per swing
+        if high is not None and c > high.price and self._bos_high != high.index:
+            self._bos_high = high.index
+            events.append(PatternEvent("bos", BULLISH, i, c, {"level": high.price}))
+        if low is not None and c < low.price and self._bos_low != low.index:
+            self._bos_low = low.index
+            events.append(PatternEvent("bos", BEARISH, i, c, {"level": low.price}))
+        # liquidity sweep: wick beyond the swing but close back inside
+        if high is not None and h > high.price >= c and self._swept_high != high.index:
+            self._swept_high = high.index
+            events.append(PatternEvent("sweep", BEARISH, i, c, {"level": high.price}))
+        if low is not None and l < low.price <= c and self._swept_low != low.index:
+            self._swept_low = low.index
+            events.append(PatternEvent("sweep", BULLISH, i, c, {"level": low.price}))
+
+        # entering the retracement zone of the latest leg
+        zone = self.fib_zone_bounds()
+        in_zone = zone is not None and zone[0] <= c <= zone[1]
+        if in_zone and not self._in_fib_zone:
+            events.append(PatternEvent("fib_zone", self.leg, i, c, {"low": zone[0], "high": zone[1]}))
+        self._in_fib_zone = in_zone
+
+        self.bar_events = events
+        return events
+
+    def _update_fib(self):
+        high, low = self.swings.last_high, self.swings.last_low
+        if high is None or low is None or high.price <= low.price:
+            self.fib_levels, self.leg = {}, None
+            return
+        span = high.price - low.price
+        if low.index < high.index:
+            self.leg = BULLISH
+            self.fib_levels = {r: high.price - r * span for r in FIB_RATIOS}
+        else:
+            self.leg = BEARISH
+            self.fib_levels = {r: low.price + r * span for r in FIB_RATIOS}
+
+    def fib_zone_bounds(self) -> Optional[tuple]:
+        if not self.fib_levels:
+            return None
+        a, b = (self.fib_levels[r] for r in self.fib_zone)
+        return min(a, b), max(a, b)
+
+    def sync(self, data: pd.DataFrame) -> List[PatternEvent]:
+        """Feeds rows of ``data`` newer than the last bar seen; returns their events."""
+        if self.last_timestamp is not None:
+            data = data[data['timestamp'] > self.last_timestamp]
+        if not len(data):
+            self.bar_events = []  # nothing new, so nothing fires again
+            return []
+        events = []
+        for row in zip(data['timestamp'], data['open'], data['high'], data['low'], data['close']):
+            events.extend(self.update(*row))
+        return events
+
+    def latest(self, kind: str) -> Optional[PatternEvent]:
+        """Most recent ``kind`` event raised on the latest bar, if any."""
+        for event in reversed(self.bar_events):
+            if event.kind == kind:
+                return event
+        return None
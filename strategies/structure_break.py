@@ -9,6 +9,11 @@ import logging
 import asyncio
 import time
 
+try:
+    from strategies.patterns import BULLISH, PatternTracker
+except ModuleNotFoundError:  # run directly as strategies/structure_break.py
+    from patterns import BULLISH, PatternTracker
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -66,7 +71,7 @@ def detect_market_regime(data: pd.DataFrame) -> MarketRegime:
 
 # Simulated historical market data
 def get_historical_data(periods=200) -> pd.DataFrame:
-    dates = pd.date_range(end=datetime.now(), periods=periods, freq='5T')
+    dates = pd.date_range(end=datetime.now(), periods=periods, freq='5min')
     price = 1.2000
     data = []
     for date in dates:
@@ -82,13 +87,32 @@ def get_historical_data(periods=200) -> pd.DataFrame:
         })
     return pd.DataFrame(data)
 
+# Next simulated bar, appended to the rolling window
+def next_bar(data: pd.DataFrame, periods=200) -> pd.DataFrame:
+    last = data.iloc[-1]
+    price = last['close'] + np.random.normal(0, 0.0008)
+    bar = {
+        'timestamp': last['timestamp'] + pd.Timedelta(minutes=5),
+        'open': last['close'],
+        'high': max(last['close'], price) + abs(np.random.normal(0, 0.0003)),
+        'low': min(last['close'], price) - abs(np.random.normal(0, 0.0003)),
+        'close': price,
+        'volume': np.random.randint(500, 1500)
+    }
+    return pd.concat([data, pd.DataFrame([bar])], ignore_index=True).tail(periods)
+
 # Structure Break Strategy
-def structure_break(data: pd.DataFrame, regime: MarketRegime, weight: float) -> Optional[Signal]:
-    if np.random.random() > 0.15:  # 15% chance to generate a signal
+def structure_break(data: pd.DataFrame, regime: MarketRegime, weight: float,
+                    tracker: Optional[PatternTracker] = None) -> Optional[Signal]:
+    # pass a long-lived tracker to update incrementally; otherwise the whole window is scanned
+    tracker = tracker or PatternTracker()
+    tracker.sync(data)
+    event = tracker.latest("bos")
+    if event is None:
         return None
     current_price = data['close'].iloc[-1]
     atr = calculate_atr(data)
-    signal_type = TradeType.BUY if np.random.random() > 0.5 else TradeType.SELL
+    signal_type = TradeType.BUY if event.direction == BULLISH else TradeType.SELL
     if signal_type == TradeType.BUY:
         stop_loss = current_price - (atr * 2.5)
         take_profit = current_price + (atr * 5)
@@ -114,13 +138,15 @@ def structure_break(data: pd.DataFrame, regime: MarketRegime, weight: float) ->
 async def main():
     logger.info("🚀 Structure Break Strategy Test Starting...")
     data = get_historical_data()
-    regime = detect_market_regime(data)
+    tracker = PatternTracker()
     while True:
-        signal = structure_break(data, regime, weight=0.25)
+        regime = detect_market_regime(data)
+        signal = structure_break(data, regime, weight=0.25, tracker=tracker)
         if signal:
             logger.info(f"📊 SIGNAL GENERATED: {signal.strategy} {signal.signal_type.value.upper()} | "
                         f"Entry: {signal.entry:.5f} | SL: {signal.stop_loss:.5f} | TP: {signal.take_profit:.5f} | "
                         f"Confidence: {signal.confidence:.1f}%")
+        data = next_bar(data)
         await asyncio.sleep(3)
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from dynamic_trading_system6 import TechnicalIndicators
+from market_data.bar_pyramid import BarPyramid
+
+
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.2 + np.cumsum(rng.normal(0, 0.002, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1min'),
+        'open': close, 'high': close + 0.0005, 'low': close - 0.0005, 'close': close,
+    })
+
+
+def test_regime_matches_full_recompute():
+    data = _bars(400)
+    pyramid = BarPyramid()
+    for i, row in enumerate(data.itertuples()):
+        pyramid.add_bar(row.timestamp, row.open, row.high, row.low, row.close)
+        closed = data.iloc[:i]  # the base level closes a bar when the next one opens
+        if i >= 1:
+            assert pyramid.regime("1m").value == TechnicalIndicators.detect_market_regime(closed).value
+    prices = data['close'].values[-51:-1]
+    stats = pyramid.stats("1m")
+    assert np.isclose(stats.volatility, np.std(np.diff(prices) / prices[:-1]))
+    assert np.isclose(stats.range, data['high'].values[-51:-1].max() - data['low'].values[-51:-1].min())
+
+
+def test_rollup_matches_resample():
+    data = _bars(62)
+    pyramid = BarPyramid()
+    for row in data.itertuples():
+        pyramid.add_bar(row.timestamp, row.open, row.high, row.low, row.close, 1.0)
+    expected = data.set_index('timestamp').resample('5min').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'})
+    bar = pyramid.levels["5m"].last_closed
+    last = expected.iloc[-2]  # the 01:00 bucket is still open
+    assert (bar.open, bar.high, bar.low, bar.close) == (last.open, last.high, last.low, last.close)
+    assert bar.volume == 5.0
+
+
+def test_sync_uses_bar_timestamps_and_engine_regime_type():
+    from dynamic_trading_system6 import MarketRegime
+    data = _bars(120)
+    pyramid = BarPyramid()
+    assert pyramid.sync(data.iloc[:100]) == 100
+    assert pyramid.sync(data) == 20 and pyramid.sync(data) == 0
+    assert pyramid.levels["1m"].current.start == data['timestamp'].iloc[-1].timestamp()
+    expected = TechnicalIndicators.detect_market_regime(data.iloc[:-1])
+    assert pyramid.regime("1m") == expected and isinstance(expected, MarketRegime)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cache import ResultCache
+
+
+def test_memoize_roundtrip_and_invalidation(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    @cache.memoize(strategy="atr")
+    def rolling_atr(data, period=14):
+        calls.append(period)
+        return (data['high'] - data['low']).rolling(period).mean()
+
+    data = pd.DataFrame({'high': np.arange(50.0) + 1, 'low': np.arange(50.0)},
+                        index=pd.date_range('2024-01-01', periods=50, freq='5min'))
+    first = rolling_atr(data, period=14)
+    second = rolling_atr(data, period=14)
+    pd.testing.assert_series_equal(first, second, check_freq=False)
+    assert calls == [14]
+
+    rolling_atr(data, period=10)
+    rolling_atr(data.iloc[1:], period=14)
+    assert calls == [14, 10, 14]
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3 * 9000)
+    keys = [cache.key(strategy="s", params={"i": i}) for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, np.zeros(1000))
+    assert cache.get(keys[0]) is not None  # keys[1] is now least recently used
+    cache.put(keys[3], np.zeros(1000))
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+
+
+def test_roundtrip_without_pickle(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    index = pd.date_range('2024-01-01', periods=4, freq='h', tz='Europe/London')
+    trades = pd.DataFrame({'side': ['buy', 'sell', 'buy', 'sell'], 'pnl': [1.0, -0.5, 2.0, 0.25],
+                           'time': index}, index=index)
+    equity = pd.Series([1.0, 2.0, 3.0, 4.0], index=index, name='equity')
+    stats = {'sharpe': 1.5, 'max_dd': None, 'symbol': 'EURUSD'}
+    for i, value in enumerate((trades, equity)):
+        cache.put(f"k{i}", value)
+    cache.put("k2", stats)
+    pd.testing.assert_frame_equal(cache.get("k0"), trades, check_freq=False)
+    pd.testing.assert_series_equal(cache.get("k1"), equity, check_freq=False)
+    assert cache.get("k2") == stats
+    assert cache.hits == 3 and cache.misses == 0
+
+    with pytest.raises(TypeError):
+        cache.put("bad", pd.Series([{'a': 1}, None]))
+
+
+def test_overwrite_keeps_size(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for _ in range(3):
+        cache.put("k", np.zeros(1000))
+    assert cache._size == sum(size for _, _, size in cache._entries())
+
+
+def test_labels_and_names_roundtrip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    frame = pd.DataFrame(np.arange(6.0).reshape(3, 2), columns=[14, 28])
+    frame.index.name = 'bar'
+    series = pd.Series([1.0, 2.0], name=('atr', 14))
+    stats = {14: 1.0, ('sl', 2): 0.5}
+    cache.put("f", frame)
+    cache.put("s", series)
+    cache.put("d", stats)
+    pd.testing.assert_frame_equal(cache.get("f"), frame)
+    pd.testing.assert_series_equal(cache.get("s"), series)
+    assert cache.get("d") == stats
+
+    with pytest.raises(TypeError):
+        cache.put("bad", pd.Series([1.0], name=pd.Timestamp('2024-01-01')))
+
+
+def test_cached_none_is_a_hit(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_compute("k", compute) is None
+    assert cache.get_or_compute("k", compute) is None
+    assert calls == [1]
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from dynamic_trading_system6 import TechnicalIndicators
+from indicators import cross_sectional as xs
+
+
+def _frame(n, seed, drift=0.0):
+    rng = np.random.default_rng(seed)
+    close = 1.2 + np.cumsum(rng.normal(drift, 0.004, n))
+    return pd.DataFrame({'high': close + np.abs(rng.normal(0, 0.001, n)),
+                         'low': close - np.abs(rng.normal(0, 0.001, n)), 'close': close})
+
+
+def test_scan_matches_per_symbol_indicators_on_ragged_histories():
+    frames = {f"S{i}": _frame(n, i, drift) for i, (n, drift) in
+              enumerate([(200, 0.0), (60, 0.002), (50, 0.0), (20, 0.0), (14, 0.0), (5, 0.0)])}
+    result = xs.scan(frames)
+    for symbol, data in frames.items():
+        row = result.loc[symbol]
+        np.testing.assert_allclose(row['atr'], TechnicalIndicators.calculate_atr(data), rtol=1e-9)
+        np.testing.assert_allclose(row['rsi'], TechnicalIndicators.calculate_rsi(data), rtol=1e-9)
+        assert row['regime'] == TechnicalIndicators.detect_market_regime(data).value
+
+
+def test_mask_with_holes_is_right_aligned():
+    close = np.array([[1.0, np.nan, 1.1, 1.2, 1.3], [np.nan, np.nan, 1.0, 0.9, 1.0]])
+    expected = [TechnicalIndicators.calculate_rsi(pd.DataFrame({'close': [1.0, 1.1, 1.2, 1.3]}), 3),
+                TechnicalIndicators.calculate_rsi(pd.DataFrame({'close': [1.0, 0.9, 1.0]}), 3)]
+    np.testing.assert_allclose(xs.rsi(close, 3), expected)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from dynamic_trading_system6 import Position, TradeType
+from execution.fill_resolution import (OPEN, STOP_LOSS, TAKE_PROFIT, DrillDown, resolve_fills,
+                                       resolve_positions)
+
+
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.2 + np.cumsum(rng.normal(0, 0.001, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.0004, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.0004, n))
+    return open_, high, low, close
+
+
+def _brute(high, low, start, direction, sl, tp):
+    out = []
+    for s, d, stop, target in zip(start, direction, sl, tp):
+        for j in range(s, len(high)):
+            sl_hit = low[j] <= stop if d > 0 else high[j] >= stop
+            tp_hit = high[j] >= target if d > 0 else low[j] <= target
+            if sl_hit or tp_hit:
+                out.append((j, STOP_LOSS if sl_hit else TAKE_PROFIT, sl_hit and tp_hit))
+                break
+        else:
+            out.append((-1, OPEN, False))
+    return out
+
+
+@pytest.mark.parametrize("window", [1, 7, 64])
+def test_matches_brute_force(window):
+    open_, high, low, close = _bars(3000)
+    rng = np.random.default_rng(1)
+    p = 500
+    start = rng.integers(1, 3000, p)
+    direction = rng.choice([-1, 1], p)
+    entry = close[start - 1]
+    sl = entry - direction * rng.uniform(0.001, 0.02, p)
+    tp = entry + direction * rng.uniform(0.001, 0.02, p)
+    result = resolve_fills(high, low, start, direction, sl, tp, window=window, max_cells=5000)
+    expected = _brute(high, low, start, direction, sl, tp)
+    assert result.exit_index.tolist() == [e[0] for e in expected]
+    assert result.outcome.tolist() == [e[1] for e in expected]
+    assert result.ambiguous.tolist() == [e[2] for e in expected]
+    hit = result.outcome != OPEN
+    assert np.allclose(result.exit_price[hit], np.where(result.outcome[hit] == TAKE_PROFIT, tp[hit], sl[hit]))
+    assert np.isnan(result.exit_price[~hit]).all()
+
+
+def test_ambiguity_policies_and_drill_down():
+    # one bar spanning both levels of a long at 1.0 (SL 0.99, TP 1.01), opening near the target
+    high, low, open_ = np.array([1.02]), np.array([0.98]), np.array([1.008])
+    args = (high, low, [0], [1], [0.99], [1.01])
+    assert resolve_fills(*args).outcome[0] == STOP_LOSS
+    assert resolve_fills(*args, policy="target_first").outcome[0] == TAKE_PROFIT
+    assert resolve_fills(*args, open_=open_, policy="nearest_open").outcome[0] == TAKE_PROFIT
+    with pytest.raises(ValueError):
+        resolve_fills(*args, policy="nearest_open")
+
+    t0 = np.datetime64('2024-01-01T00:00')
+    sub_times = t0 + np.arange(4) * np.timedelta64(15, 'm')
+    drill = DrillDown.from_timestamps([t0], sub_times, high=[1.0, 1.015, 1.0, 0.995],
+                                      low=[0.995, 1.0, 0.98, 0.99], open_=[1.0, 1.0, 1.0, 0.99])
+    result = resolve_fills(*args, drill_down=drill)
+    assert result.outcome[0] == TAKE_PROFIT and result.ambiguous[0]
+    # a sub-bar that is itself ambiguous falls back to the policy
+    drill = DrillDown(high=[1.02], low=[0.98], open_=[1.0], bounds=[[0, 1]])
+    assert resolve_fills(*args, drill_down=drill, policy="target_first").outcome[0] == TAKE_PROFIT
+
+
+def test_gap_fills_at_open():
+    high, low, open_ = np.array([1.0, 0.985]), np.array([0.995, 0.97]), np.array([1.0, 0.98])
+    result = resolve_fills(high, low, [1], [1], [0.99], [1.05], open_=open_, gaps=True)
+    assert result.outcome[0] == STOP_LOSS and result.exit_price[0] == pytest.approx(0.98)
+    assert resolve_fills(high, low, [1], [1], [0.99], [1.05], open_=open_).exit_price[0] == pytest.approx(0.99)
+
+
+def test_resolve_positions():
+    import pandas as pd
+    open_, high, low, close = _bars(200, seed=3)
+    t0 = datetime(2024, 1, 1)
+    bars = pd.DataFrame({'timestamp': [t0 + timedelta(minutes=i) for i in range(200)],
+                         'open': open_, 'high': high, 'low': low, 'close': close})
+    positions = [Position(f"p{i}", "s", TradeType.BUY if i % 2 else TradeType.SELL, close[10 * i],
+                          close[10 * i] - (1 if i % 2 else -1) * 0.003,
+                          close[10 * i] + (1 if i % 2 else -1) * 0.003, 2.0, t0 + timedelta(minutes=10 * i))
+                 for i in range(10)]
+    frame = resolve_positions(positions, bars)
+    direction = [1 if i % 2 else -1 for i in range(10)]
+    expected = _brute(high, low, [10 * i + 1 for i in range(10)], direction,
+                      [p.stop_loss for p in positions], [p.take_profit for p in positions])
+    assert frame['exit_index'].tolist() == [e[0] for e in expected]
+    closed = frame['outcome'] != OPEN
+    assert np.allclose(frame.loc[closed, 'pnl'].abs(), 0.006)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dynamic_trading_system6 import TechnicalIndicators
+from indicators import kernels
+
+
+def _data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.2 + np.cumsum(rng.normal(0, 0.0008, n))
+    return pd.DataFrame({
+        'high': close + np.abs(rng.normal(0, 0.0003, n)),
+        'low': close - np.abs(rng.normal(0, 0.0003, n)),
+        'close': close,
+    })
+
+
+def _cols(data):
+    return [data[c].to_numpy(dtype=float) for c in ('high', 'low', 'close')]
+
+ATR = [kernels._atr_last_loop, kernels._atr_last_numpy, kernels.atr_last]
+RSI = [kernels._rsi_last_loop, kernels._rsi_last_numpy, kernels.rsi_last]
+TR = [kernels._true_range_loop, kernels._true_range_numpy, kernels.true_range]
+MEAN = [kernels._rolling_mean_loop, kernels._rolling_mean_numpy, kernels.rolling_mean]
+HITS = [kernels._sl_tp_hits_loop, kernels._sl_tp_hits_numpy, kernels.sl_tp_hits]
+
+
+@pytest.mark.parametrize("n", [5, 14, 15, 200])
+@pytest.mark.parametrize("period", [3, 14])
+def test_atr_rsi_parity(n, period):
+    data = _data(n, seed=n)
+    high, low, close = _cols(data)
+    for atr in ATR:
+        np.testing.assert_allclose(atr(high, low, close, period),
+                                   TechnicalIndicators.calculate_atr(data, period), rtol=1e-9)
+    for rsi in RSI:
+        np.testing.assert_allclose(rsi(close, period),
+                                   TechnicalIndicators.calculate_rsi(data, period), rtol=1e-9)
+
+
+def test_rsi_without_losses():
+    data = pd.DataFrame({'close': np.linspace(1.0, 2.0, 30)})
+    for rsi in RSI:
+        assert rsi(data['close'].to_numpy(), 14) == TechnicalIndicators.calculate_rsi(data) == 100
+
+
+def test_true_range_and_rolling_mean_parity():
+    data = _data(100)
+    high, low, close = _cols(data)
+    expected_tr = np.maximum(data['high'] - data['low'],
+                             np.maximum(abs(data['high'] - data['close'].shift()),
+                                        abs(data['low'] - data['close'].shift())))
+    for tr in TR:
+        np.testing.assert_allclose(tr(high, low, close), expected_tr.to_numpy(), rtol=1e-12)
+    for mean in MEAN:
+        np.testing.assert_allclose(mean(expected_tr.to_numpy(), 14),
+                                   expected_tr.rolling(14).mean().to_numpy(), rtol=1e-9)
+
+
+def test_sl_tp_hits():
+    direction = np.array([1, 1, 1, -1, -1, -1])
+    stop_loss = np.array([1.19, 1.21, 1.10, 1.21, 1.19, 1.30])
+    take_profit = np.array([1.21, 1.30, 1.20, 1.19, 1.10, 1.20])
+    for hits in HITS:
+        assert hits(direction, stop_loss, take_profit, 1.20).tolist() == [0, -1, 1, 0, -1, 1]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from execution.mark_to_market import EquityBuffer, MarkToMarket
+
+
+def test_equity_drawdown_and_strategy_pnl():
+    mtm = MarkToMarket(10_000, capacity=2)
+    mtm.open("POS1", "a", 1, 1.2000, 100)
+    mtm.open("POS2", "b", -1, 1.2000, 100)
+    mtm.open("POS3", "a", 1, 1.1000, 10)
+    now = datetime(2024, 1, 1)
+    assert np.isclose(mtm.mark(1.3, now), 10_000 + 10 - 10 + 2)
+    mtm.close("POS1", 10.0)
+    assert np.isclose(mtm.mark(1.0, now), 10_010 + 20 - 1)
+    assert np.isclose(mtm.unrealized_pnl("POS3"), -1.0)
+    pnl = mtm.strategy_pnl()
+    assert np.isclose(pnl["a"]["realized"], 10.0) and np.isclose(pnl["a"]["unrealized"], -1.0)
+    assert np.isclose(pnl["b"]["unrealized"], 20.0)
+    assert np.isclose(mtm.mark(2.0, now), 10_010 - 80 + 9)
+    assert np.isclose(mtm.max_drawdown, (10_029 - 9_939) / 10_029)
+
+
+def test_equity_buffer_is_bounded():
+    buf = EquityBuffer(capacity=8)
+    start = datetime(2024, 1, 1)
+    for i in range(1000):
+        buf.append(start + timedelta(seconds=i), float(i))
+    times, values = buf.series()
+    assert len(buf) <= 8
+    assert values[0] == 0 and np.all(np.diff(values) == buf.stride)
+
+
+def test_engine_writes_live_pnl_back_to_positions():
+    import asyncio
+
+    from dynamic_trading_system6 import DynamicTradingSystem, Position, TradeType
+
+    class Prices:
+        def __init__(self, prices):
+            self.prices = iter(prices)
+
+        async def get_live_price(self):
+            return next(self.prices)
+
+    system = DynamicTradingSystem(data_provider=Prices([1.2010, 1.2030]))
+    system.offloader.shutdown()
+    now = datetime(2024, 1, 1)
+    for pos in (Position("A", "s", TradeType.BUY, 1.2, 1.19, 1.22, 100.0, now),
+                Position("B", "s", TradeType.SELL, 1.2, 1.2025, 1.18, 100.0, now)):
+        system.positions.append(pos)
+        system.mtm.open(pos.id, pos.strategy, 1 if pos.signal_type == TradeType.BUY else -1, pos.entry, pos.size)
+    a, b = system.positions
+
+    asyncio.run(system.update_positions())
+    assert np.isclose(a.unrealized_pnl, 0.1) and np.isclose(b.unrealized_pnl, -0.1)
+    asyncio.run(system.update_positions())  # B's stop is hit
+    assert np.isclose(a.unrealized_pnl, 0.3)
+    assert b.status == "closed" and b.unrealized_pnl == 0.0 and np.isclose(b.realized_pnl, -0.25)
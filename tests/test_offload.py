@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from dynamic_trading_system6 import DynamicTradingSystem
+
+from utils.loop_monitor import LoopLagMonitor
+from utils.offload import Offloader
+
+
+def test_inflight_bound_and_loop_stays_responsive():
+    offloader = Offloader(max_inflight=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)  # blocking, but off the loop
+        with lock:
+            active[0] -= 1
+        return 1
+
+    async def main():
+        monitor = LoopLagMonitor(interval=0.01, threshold_ms=30).start()
+        results = await asyncio.gather(*(offloader.run(work) for _ in range(8)))
+        await monitor.stop()
+        return results, monitor.report()
+
+    results, lag = asyncio.run(main())
+    offloader.shutdown()
+    assert sum(results) == 8 and peak[0] == 2
+    assert lag["samples"] > 0 and lag["over_threshold"] == 0
+
+
+def test_shutdown_cancels_pending_work():
+    offloader = Offloader(max_inflight=1)
+
+    async def main():
+        tasks = [offloader.submit(time.sleep, 0.05) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        offloader.shutdown()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(o, asyncio.CancelledError) for o in outcomes)
+
+
+def test_engine_rejects_process_executor():
+    executor = ProcessPoolExecutor(max_workers=1)
+    try:
+        with pytest.raises(TypeError):
+            DynamicTradingSystem(executor=executor)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from strategies.patterns import BEARISH, BULLISH, PatternTracker, SwingDetector
+
+
+def test_swings_match_brute_force():
+    rng = np.random.default_rng(3)
+    highs = 1.2 + np.cumsum(rng.normal(0, 0.001, 300))
+    lows = highs - 0.0005
+    k = 3
+    detector = SwingDetector(k)
+    found = []
+    for i, (h, l) in enumerate(zip(highs, lows)):
+        found += [(s.index, s.kind) for s in detector.update(i, i, h, l)]
+    expected = []
+    for c in range(k, len(highs) - k):
+        window = slice(c - k, c + k + 1)
+        if highs[c] == highs[window].max() and highs[c] > highs[c + 1:c + k + 1].max():
+            expected.append((c, "high"))
+        if lows[c] == lows[window].min() and lows[c] < lows[c + 1:c + k + 1].min():
+            expected.append((c, "low"))
+    assert found == expected
+
+
+def test_structure_break_sweep_and_fib_levels():
+    closes = [1.0, 1.1, 1.2, 1.3, 1.2, 1.1, 1.0, 1.05, 1.1, 1.15, 1.2, 1.25, 1.35]
+    data = pd.DataFrame({'timestamp': range(len(closes)), 'open': closes, 'high': closes,
+                         'low': closes, 'close': closes})
+    tracker = PatternTracker(strength=2)
+    events = tracker.sync(data)
+    bos = [e for e in events if e.kind == "bos"]
+    assert [(e.direction, e.index, e.detail["level"]) for e in bos] == [(BULLISH, 12, 1.3)]
+    assert tracker.latest("bos") is bos[0]
+    assert tracker.leg == BEARISH
+    assert np.isclose(tracker.fib_levels[0.5], 1.15)
+
+    tracker.sync(data)  # no new bars: nothing fires again
+    assert tracker.latest("bos") is None
+
+    wick = pd.DataFrame({'timestamp': [13, 14, 15, 16, 17], 'open': [1.3] * 5,
+                         'high': [1.3, 1.28, 1.29, 1.31, 1.40], 'low': [1.3, 1.28, 1.29, 1.31, 1.30],
+                         'close': [1.3, 1.28, 1.29, 1.31, 1.32]})
+    tracker.sync(wick)
+    assert tracker.latest("sweep").direction == BEARISH
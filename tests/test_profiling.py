@@ -0,0 +1,21 @@
+import threading
+import time
+
+from utils.profiling import ProfileSession
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_samples_worker_threads():
+    with ProfileSession("test", sample_interval=0.002, snapshot_interval=60) as session:
+        worker = threading.Thread(target=_spin, args=(0.3,), name="compute_0")
+        worker.start()
+        worker.join()
+    assert "compute_0" in session.thread_samples
+    assert any(thread == "compute_0" and func == "_spin"
+               for thread, _, func in session.cumulative_samples)
+    assert "[compute_0] _spin" in session.report()
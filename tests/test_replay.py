@@ -0,0 +1,28 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from dynamic_trading_system6 import DynamicTradingSystem
+from market_data.replay import ReplayDataProvider
+
+
+def test_replay_streams_whole_file_with_bounded_memory(tmp_path):
+    n = 5000
+    ticks = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1s'),
+        'price': 1.2 + np.cumsum(np.random.default_rng(0).normal(0, 0.0001, n)),
+    })
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+
+    provider = ReplayDataProvider(str(path), speed=None, chunk_size=700, max_bars=300)
+    system = DynamicTradingSystem(data_provider=provider)
+    asyncio.run(system.run())
+
+    assert provider.exhausted
+    assert provider.rows_replayed == n
+    assert len(provider.data) == 300
+    assert provider.data['close'].iloc[-1] == ticks['price'].iloc[-1]
+    assert provider.clock.now() >= ticks['timestamp'].iloc[-1]
+    assert all(p.entry_time <= provider.clock.now() for p in system.positions)
@@ -0,0 +1,99 @@
+import multiprocessing as mp
+
+import numpy as np
+
+from market_data.shm_bus import BusReader, MarketDataBus
+
+
+def _consume(name, expected, out):
+    bus = MarketDataBus.attach(name)
+    reader = BusReader(bus, from_start=True)
+    seen = []
+    while len(seen) < expected:
+        seen.extend(reader.read()['close'].tolist())
+    out.put(seen)
+    del reader
+    bus.close()
+
+
+def test_reader_sees_records_in_order_and_detects_overrun():
+    bus = MarketDataBus.create(capacity=8)
+    try:
+        reader = BusReader(bus)
+        for i in range(5):
+            bus.publish_tick(i, float(i))
+        records = reader.read(copy=False)
+        assert records['seq'].tolist() == [0, 1, 2, 3, 4]
+        assert reader.valid()
+        for i in range(5, 30):
+            bus.publish_tick(i, float(i))
+        assert not reader.valid()
+        records = reader.read()
+        assert records['close'].tolist() == [float(i) for i in range(23, 30)]
+        assert reader.lost == 18 and reader.overruns == 1
+        del records
+    finally:
+        del reader
+        bus.close()
+
+
+def test_reader_drops_slots_overwritten_mid_frame_publish():
+    bus = MarketDataBus.create(capacity=8)
+    try:
+        for i in range(8):
+            bus.publish_tick(i, float(i))
+        reader = BusReader(bus, from_start=True)
+        view_reader = BusReader(bus, from_start=True)
+        view = view_reader.read(copy=False)
+        assert view_reader.valid()
+        # the first half of publish_frame: slots rewritten, header not yet advanced
+        seqs = np.arange(8, 12)
+        idx = seqs % bus.capacity
+        bus.ring['seq'][idx] = -1
+        bus.ring['close'][idx] = seqs
+        bus.ring['seq'][idx[:2]] = seqs[:2]
+        records = reader.read()
+        assert records['seq'].tolist() == [4, 5, 6, 7]
+        assert reader.lost == 3 and reader.overruns == 1
+        assert not view_reader.valid()
+        del records, view
+    finally:
+        del reader, view_reader
+        bus.close()
+
+
+def test_cross_process_reader():
+    bus = MarketDataBus.create(capacity=1024)
+    out = mp.Queue()
+    try:
+        proc = mp.Process(target=_consume, args=(bus.name, 500, out))
+        proc.start()
+        for i in range(500):
+            bus.publish_tick(i, float(i))
+        seen = out.get(timeout=10)
+        proc.join(timeout=10)
+        assert np.array_equal(seen, np.arange(500.0))
+    finally:
+        bus.close()
+
+
+def test_feed_process_replays_file_with_source_timestamps(tmp_path):
+    import pandas as pd
+
+    from market_data.shm_bus import FeedProcess, to_frame
+
+    data = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=1000, freq='1min'),
+                         'open': 1.0, 'high': 1.1, 'low': 0.9, 'close': np.linspace(1, 2, 1000), 'volume': 1.0})
+    path = tmp_path / "bars.csv"
+    data.to_csv(path, index=False)
+    feed = FeedProcess(capacity=4096, path=str(path), batch=128)
+    reader = BusReader(feed.bus, from_start=True)
+    try:
+        feed.start()
+        feed._proc.join(timeout=10)
+        frame = to_frame(reader.read())
+        assert frame['timestamp'].tolist() == data['timestamp'].tolist()
+        assert np.allclose(frame['close'], data['close'])
+    finally:
+        del reader
+        feed.stop()
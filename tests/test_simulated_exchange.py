@@ -0,0 +1,69 @@
+import asyncio
+
+from execution.simulated_exchange import BUY, SELL, OrderBook, SimulatedExchange, SimulatedMarketDataProvider
+
+
+def test_price_time_priority():
+    book = OrderBook()
+    first, _ = book.submit_limit(SELL, 1.20010, 5)
+    second, _ = book.submit_limit(SELL, 1.20010, 5)
+    book.submit_limit(SELL, 1.20005, 3)
+    fills = book.submit_market(BUY, 10)
+    assert [(f[1], f[3]) for f in fills] == [(3, 3), (first, 5), (second, 2)]
+    assert book.orders[second].qty == 3
+
+
+def test_limit_rests_remainder_and_cancel():
+    book = OrderBook()
+    book.submit_limit(SELL, 1.2001, 2)
+    order_id, fills = book.submit_limit(BUY, 1.2002, 5)
+    assert sum(f[3] for f in fills) == 2
+    assert book.best_bid() == book.to_price(book.to_ticks(1.2002))
+    assert book.cancel(order_id)
+    assert book.best_bid() is None and book.best_ask() is None
+
+
+def test_slippage_is_adverse():
+    exchange = SimulatedExchange(seed=1, slippage_bps=1.0)
+    ask = exchange.book.best_ask()
+    fill = exchange.submit_market("buy", 1.0)
+    assert fill > ask
+
+
+def test_provider_bars_carry_per_bar_volume_and_engine_uses_its_clock():
+    from dynamic_trading_system6 import DynamicTradingSystem
+
+    exchange = SimulatedExchange(seed=0)
+    provider = SimulatedMarketDataProvider(exchange)
+    system = DynamicTradingSystem(data_provider=provider, exchange=exchange)
+    assert system.clock is provider.clock
+
+    async def drive():
+        provider.get_historical_data()
+        before = exchange.book.traded_volume
+        exchange.submit_market(BUY, 3.0)
+        await provider.get_live_price()
+        await provider.get_live_price()
+        return before
+
+    before = asyncio.run(drive())
+    system.offloader.shutdown()
+    volumes = provider.data['volume'].tolist()
+    assert volumes[-2] == exchange.book.traded_volume - before == 3.0 and volumes[-1] == 0.0
+    assert provider.data['timestamp'].iloc[-1] == system.clock.now()
+
+
+def test_engine_trades_against_exchange_process():
+    from execution.simulated_exchange import ExchangeProcess, benchmark_engine
+
+    result = benchmark_engine(cycles=60, process=True)
+    assert result["positions"] > 0 and result["exchange_orders"] >= result["positions"]
+
+    proc = ExchangeProcess(seed=1, latency_ms=1.0).start()
+    try:
+        mid, _ = proc.quote()
+        fill = asyncio.run(proc.execute_market(BUY, 1.0))
+        assert fill is not None and fill > mid
+        assert proc.quote()[1] == 1.0 and proc.orders_received == 1
+    finally:
+        proc.stop()
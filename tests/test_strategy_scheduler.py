@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from execution.strategy_scheduler import StrategyScheduler
+
+
+def test_deadline_miss_and_stale_results_are_dropped():
+    stale = {"value": False}
+    scheduler = StrategyScheduler(is_stale=lambda bar_time: stale["value"])
+    scheduler.add("fast", lambda data, regime, weight: ("fast", weight), priority=0, deadline=1.0)
+    scheduler.add("slow", lambda data, regime, weight: time.sleep(0.3) or ("slow", weight),
+                  priority=1, deadline=0.05)
+    weights = {"fast": 0.5, "slow": 0.5}
+
+    signals = asyncio.run(scheduler.run(None, None, weights, bar_time=1))
+    assert signals == [("fast", 0.5)]
+    report = scheduler.report()
+    assert report["slow"]["deadline_misses"] == 1 and report["fast"]["completed"] == 1
+
+    stale["value"] = True
+    assert asyncio.run(scheduler.run(None, None, weights, bar_time=1)) == []
+    assert scheduler.report()["fast"]["stale_skips"] == 1
+    scheduler.shutdown()
+
+
+def test_engine_skips_signals_when_a_bar_arrives_mid_evaluation():
+    import numpy as np
+    import pandas as pd
+
+    from dynamic_trading_system6 import DynamicTradingSystem
+    from market_data.shm_bus import BusDataProvider, MarketDataBus
+
+    bus = MarketDataBus.create(capacity=1024)
+    close = 1.2 + np.cumsum(np.random.default_rng(0).normal(0, 0.0005, 200))
+    stamps = pd.date_range('2024-01-01', periods=201, freq='5min')
+    bus.publish_frame(pd.DataFrame({'timestamp': stamps[:200], 'open': close, 'high': close + 0.0002,
+                                    'low': close - 0.0002, 'close': close, 'volume': 1.0}))
+    provider = BusDataProvider(bus.name)
+    system = DynamicTradingSystem(data_provider=provider)
+
+    def publish_bar_then_signal(data, regime, weight):
+        bus.publish_bar(stamps[200], 1.2, 1.2, 1.2, 1.2)  # the feed moves on mid-evaluation
+        return "signal"
+
+    for task in system.scheduler.tasks.values():
+        task.func = lambda data, regime, weight: "signal"
+    system.scheduler.tasks["structureBreak"].func = publish_bar_then_signal
+    try:
+        fresh = asyncio.run(system.generate_signals())
+        assert fresh == []
+        assert system.scheduler.tasks["structureBreak"].stale_skips == 1
+        system.scheduler.tasks["structureBreak"].func = lambda data, regime, weight: "signal"
+        assert asyncio.run(system.generate_signals()) == ["signal"] * 4  # the new bar was taken in
+    finally:
+        system.offloader.shutdown()
+        provider.close()
+        bus.close()
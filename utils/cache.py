@@ -0,0 +1,253 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH
+
+
+def fingerprint(data) -> str:
+    """Content hash of a DataFrame/Series/array (values, index and columns)."""
+    h = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        if isinstance(data, pd.DataFrame):
+            h.update(repr(list(data.columns)).encode())
+    else:
+        arr = np.ascontiguousarray(data)
+        h.update(str(arr.dtype).encode() + repr(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def code_version(code) -> str:
+    """Hash of a function's source, or the given version string as-is."""
+    if callable(code):
+        try:
+            return hashlib.sha256(inspect.getsource(code).encode()).hexdigest()[:16]
+        except (OSError, TypeError):
+            return getattr(code, "__qualname__", repr(code))
+    return str(code)
+
+# === Encoding to .npz ===
+def _pack(values, name: str, specs: dict) -> np.ndarray:
+    """Converts ``values`` to an array ``np.load`` can read without pickle.
+
+    Timezone-aware datetimes become int64 UTC ticks and object arrays of
+    strings become ``'U'`` arrays; what was converted is recorded in
+    ``specs`` so ``_unpack`` can restore it. Anything else that would need
+    pickle raises ``TypeError`` rather than becoming a permanent miss.
+    """
+    if values is None:
+        specs[name] = {"none": True}
+        return np.zeros(0)
+    if isinstance(getattr(values, "dtype", None), pd.DatetimeTZDtype):
+        specs[name] = {"tz": str(values.dtype.tz), "unit": values.dtype.unit}
+        return pd.DatetimeIndex(values).asi8
+    arr = values.to_numpy() if isinstance(values, (pd.Index, pd.Series)) else np.asarray(values)
+    if arr.dtype == object:
+        if not all(isinstance(x, str) for x in arr.ravel()):
+            raise TypeError(f"Cannot cache {name!r}: object values other than strings need pickle")
+        specs[name] = {"str": True}
+        return arr.astype(str)
+    return arr
+
+
+def _unpack(npz, name: str, specs: dict):
+    arr = npz[name]
+    spec = specs.get(name)
+    if spec is None:
+        return arr
+    if spec.get("none"):
+        return None
+    if "tz" in spec:
+        utc = pd.DatetimeIndex(arr.view(f"datetime64[{spec['unit']}]")).tz_localize("UTC")
+        return utc.tz_convert(spec["tz"])
+    return arr.astype(object)
+
+
+def _label(label):
+    """JSON form of a column label, index/series name or dict key that decodes to an equal value."""
+    if label is None or isinstance(label, (bool, str)):
+        return label
+    if isinstance(label, (int, np.integer)):
+        return int(label)
+    if isinstance(label, (float, np.floating)):
+        return float(label)
+    if isinstance(label, tuple):
+        return {"tuple": [_label(x) for x in label]}
+    raise TypeError(f"Cannot cache label {label!r} of type {type(label).__name__}")
+
+
+def _unlabel(label):
+    if isinstance(label, dict):
+        return tuple(_unlabel(x) for x in label["tuple"])
+    return label
+
+
+def _index(npz, specs: dict, name) -> pd.Index:
+    return pd.Index(_unpack(npz, "index", specs), name=_unlabel(name))
+
+
+def _encode(value) -> dict:
+    specs = {}
+    if isinstance(value, pd.DataFrame):
+        arrays = {f"col:{i}": _pack(value.iloc[:, i], f"col:{i}", specs) for i in range(value.shape[1])}
+        meta = {"kind": "frame", "columns": [_label(c) for c in value.columns],
+                "columns_name": _label(value.columns.name), "index_name": _label(value.index.name)}
+        arrays["index"] = _pack(value.index, "index", specs)
+    elif isinstance(value, pd.Series):
+        arrays = {"value": _pack(value, "value", specs), "index": _pack(value.index, "index", specs)}
+        meta = {"kind": "series", "name": _label(value.name), "index_name": _label(value.index.name)}
+    elif isinstance(value, dict):
+        arrays = {f"key:{i}": _pack(v, f"key:{i}", specs) for i, v in enumerate(value.values())}
+        meta = {"kind": "dict", "keys": [_label(k) for k in value]}
+    else:
+        arrays = {"value": _pack(value, "value", specs)}
+        meta = {"kind": "array"}
+    meta["specs"] = specs
+    arrays["__meta__"] = np.array(json.dumps(meta))
+    return arrays
+
+
+def _decode(npz) -> Any:
+    meta = json.loads(str(npz["__meta__"]))
+    kind = meta["kind"]
+    specs = meta.get("specs", {})
+    if kind == "frame":
+        columns = [_unlabel(c) for c in meta["columns"]]
+        frame = pd.DataFrame({i: _unpack(npz, f"col:{i}", specs) for i in range(len(columns))},
+                             index=_index(npz, specs, meta["index_name"]))
+        frame.columns = pd.Index(columns, tupleize_cols=True, name=_unlabel(meta["columns_name"])) \
+            if columns else frame.columns
+        return frame
+    if kind == "series":
+        return pd.Series(_unpack(npz, "value", specs), index=_index(npz, specs, meta["index_name"]),
+                         name=_unlabel(meta["name"]))
+    if kind == "dict":
+        out = {}
+        for i, k in enumerate(meta["keys"]):
+            v = _unpack(npz, f"key:{i}", specs)
+            out[_unlabel(k)] = v[()] if isinstance(v, np.ndarray) and v.ndim == 0 else v
+        return out
+    return _unpack(npz, "value", specs)
+
+# === Result cache ===
+_MISSING = object()  # get() default, so a cached None still counts as a hit
+
+class ResultCache:
+    """Content-addressed cache of indicator series and backtest outputs.
+
+    Entries are ``.npz`` files under ``DATA_PATH/cache`` named by the hash of
+    (data fingerprint, strategy, parameters, code version). Writes go to a
+    temp file and are renamed into place, so concurrent readers only ever see
+    complete files. A hit bumps the file's mtime; when the directory grows
+    past ``max_bytes`` the least recently used entries are deleted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 compress: bool = False):
+        self.path = path or os.path.join(DATA_PATH, "cache")
+        self.max_bytes = max_bytes
+        self.compress = compress
+        os.makedirs(self.path, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def key(data=None, strategy: str = "", params: Optional[dict] = None, code=None) -> str:
+        parts = {
+            "data": fingerprint(data) if data is not None else None,
+            "strategy": strategy,
+            "params": params or {},
+            "code": code_version(code) if code is not None else None,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + ".npz")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                full = os.path.join(root, name)
+                try:
+                    st = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                yield full, st.st_mtime, st.st_size
+
+    def get(self, key: str, default=None):
+        path = self._file(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                value = _decode(npz)
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            # missing, evicted by another process mid-read, unreadable or an older layout
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted after we read it; the value is still good
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                (np.savez_compressed if self.compress else np.savez)(f, **_encode(value))
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def memoize(self, func: Callable = None, *, strategy: Optional[str] = None):
+        """Decorator for ``func(data, **params)``; the key covers data, params and func's source."""
+        def wrap(fn):
+            name = strategy or fn.__qualname__
+            version = code_version(fn)
+
+            @functools.wraps(fn)
+            def wrapper(data, **params):
+                key = self.key(data, name, params, version)
+                return self.get_or_compute(key, lambda: fn(data, **params))
+            return wrapper
+        return wrap(func) if func is not None else wrap
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class WallClock:
+    """Default engine clock: real time and real sleeps."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """Simulated time for replays.
+
+    ``sleep`` advances virtual time by ``seconds`` and waits ``seconds / speed``
+    of wall time. ``speed=1`` is real time, ``speed=N`` is N x, and
+    ``speed=None`` runs as fast as possible (only yields to the event loop).
+    """
+
+    def __init__(self, start: Optional[datetime] = None, speed: Optional[float] = None):
+        self.current = start
+        self.speed = speed
+
+    def now(self) -> datetime:
+        return self.current if self.current is not None else datetime.now()
+
+    def advance_to(self, ts: datetime):
+        if self.current is None or ts > self.current:
+            self.current = ts
+
+    async def sleep(self, seconds: float):
+        if self.current is not None:
+            self.current = self.current + timedelta(seconds=seconds)
+        if self.speed:
+            await asyncio.sleep(seconds / self.speed)
+        else:
+            await asyncio.sleep(0)
@@ -0,0 +1,8 @@
+# File: enums.py
+from enum import Enum
+
+# Shared by the engine and market_data so regimes compare equal across modules
+class MarketRegime(Enum):
+    TRENDING = "trending"
+    RANGING = "ranging"
+    VOLATILE = "volatile"
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic timer.
+
+    Any lag above ``threshold_ms`` means something blocked the loop for that
+    long; those are counted and logged. Recent lags are kept in a bounded
+    window for percentiles.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold_ms: float = 50.0, window: int = 1000):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.lags = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self.over_threshold = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._watch())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.lags.append(lag_ms)
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            if lag_ms > self.threshold_ms:
+                self.over_threshold += 1
+                logger.warning(f"🐢 Event loop blocked for {lag_ms:.1f} ms (threshold {self.threshold_ms:.0f} ms)")
+
+    def report(self) -> dict:
+        lags = np.fromiter(self.lags, dtype=float)
+        return {
+            "samples": len(lags),
+            "max_lag_ms": self.max_lag_ms,
+            "p99_lag_ms": float(np.percentile(lags, 99)) if len(lags) else 0.0,
+            "over_threshold": self.over_threshold,
+            "threshold_ms": self.threshold_ms,
+        }
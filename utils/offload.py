@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional, Set
+
+
+class Offloader:
+    """Runs blocking pandas/NumPy work off the event loop with a bounded in-flight limit.
+
+    A slot is only released when the executor job itself finishes, so work
+    abandoned after a timeout still counts against ``max_inflight`` until it
+    is done. ``shutdown`` cancels everything still queued or awaited.
+
+    Any ``Executor`` works, but with a process pool ``fn`` and its arguments
+    must pickle and side effects stay in the child, so callers that offload
+    bound methods or mutate shared state need threads.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_inflight: int = 4):
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.max_inflight = max_inflight
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.in_flight = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self.closed = False
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="compute")
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if self.closed:
+            raise RuntimeError("Offloader is shut down")
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._loop is not loop:
+            self._sem, self._loop = asyncio.Semaphore(self.max_inflight), loop
+        sem = self._sem
+        await sem.acquire()
+        try:
+            job = self.executor.submit(fn, *args)
+        except BaseException:
+            sem.release()
+            raise
+        self.in_flight += 1
+        job.add_done_callback(lambda _: self._done(loop, sem))
+        return await asyncio.wrap_future(job)
+
+    def _done(self, loop, sem: asyncio.Semaphore):
+        # runs in the worker thread
+        try:
+            loop.call_soon_threadsafe(self._release, sem)
+        except RuntimeError:
+            pass  # loop already closed, its semaphore went with it
+
+    def _release(self, sem: asyncio.Semaphore):
+        self.in_flight -= 1
+        sem.release()
+
+    def submit(self, fn: Callable, *args) -> asyncio.Task:
+        task = asyncio.ensure_future(self.run(fn, *args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def shutdown(self):
+        self.closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
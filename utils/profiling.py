@@ -0,0 +1,208 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import LOG_PATH
+from utils.helpers import log_message
+
+
+# top frames of a thread that is blocked waiting rather than working
+IDLE_FRAMES = {("selectors.py", "select"), ("thread.py", "_worker"), ("threading.py", "wait"),
+               ("queue.py", "get")}
+
+
+class ProfileSession:
+    """Sampling CPU profiler plus periodic ``tracemalloc`` snapshots.
+
+    A background thread samples the stack of every other thread every
+    ``sample_interval`` seconds (no tracing hooks, so the loop runs at close
+    to full speed), keyed by thread name so the event loop and the
+    ``compute`` workers it offloads to show up side by side. Percentages are
+    the share of samples a thread spent on a line, so they add up across
+    threads; samples of a thread blocked in ``IDLE_FRAMES`` count as idle
+    and are left out of the hot lists. Every ``snapshot_interval`` seconds it records a memory
+    snapshot together with the value of each probe, e.g. the row count of
+    ``MarketDataProvider.data``.
+    """
+
+    def __init__(self, name: str = "mmm", sample_interval: float = 0.005, snapshot_interval: float = 10.0,
+                 probes: Optional[Dict[str, Callable[[], float]]] = None, frames: int = 10, top: int = 20):
+        self.name = name
+        self.sample_interval = sample_interval
+        self.snapshot_interval = snapshot_interval
+        self.probes = probes or {}
+        self.frames = frames
+        self.top = top
+        self.self_samples: Counter = Counter()
+        self.cumulative_samples: Counter = Counter()
+        self.samples = 0
+        self.thread_samples: Counter = Counter()
+        self.idle_samples: Counter = Counter()
+        self.snapshots: List[Tuple[float, tracemalloc.Snapshot]] = []
+        self.probe_series: List[Tuple[float, Dict[str, float]]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._owns_tracemalloc = False
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        self._take_snapshot()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._take_snapshot()
+        self.elapsed = time.perf_counter() - self._started
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+    def _take_snapshot(self):
+        now = time.perf_counter() - self._started
+        self.snapshots.append((now, tracemalloc.take_snapshot()))
+        values = {}
+        for name, probe in self.probes.items():
+            try:
+                values[name] = probe()
+            except Exception as exc:  # a probe must never break the profiled run
+                values[name] = float("nan")
+                log_message(f"Profiler probe {name} failed: {exc}")
+        self.probe_series.append((now, values))
+
+    def _sample_loop(self):
+        next_snapshot = time.perf_counter() + self.snapshot_interval
+        me = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                thread = names.get(ident, str(ident))
+                self.thread_samples[thread] += 1
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    self.idle_samples[thread] += 1
+                    continue
+                self.self_samples[(thread, code.co_filename, frame.f_lineno, code.co_name)] += 1
+                seen = set()
+                while frame is not None:
+                    key = (thread, frame.f_code.co_filename, frame.f_code.co_name)
+                    if key not in seen:
+                        seen.add(key)
+                        self.cumulative_samples[key] += 1
+                    frame = frame.f_back
+            if time.perf_counter() >= next_snapshot:
+                self._take_snapshot()
+                next_snapshot += self.snapshot_interval
+
+    # === Report ===
+    def report(self) -> str:
+        lines = [f"Profile report: {self.name}",
+                 f"Run time: {self.elapsed:.1f}s | CPU samples: {self.samples} "
+                 f"(every {self.sample_interval * 1000:.0f} ms) | Snapshots: {len(self.snapshots)}", ""]
+        total = max(self.samples, 1)
+
+        lines.append("Threads sampled (busy / sampled)")
+        for thread, count in self.thread_samples.most_common():
+            busy = count - self.idle_samples[thread]
+            lines.append(f"  {100 * busy / total:6.2f}% / {100 * count / total:6.2f}%  {thread}")
+        lines.append("")
+        lines.append(f"Top {self.top} hot lines (self time)")
+        for (thread, filename, lineno, func), count in self.self_samples.most_common(self.top):
+            lines.append(f"  {100 * count / total:6.2f}%  [{thread}] {func} {_short(filename)}:{lineno}")
+        lines.append("")
+        lines.append(f"Top {self.top} functions (cumulative)")
+        for (thread, filename, func), count in self.cumulative_samples.most_common(self.top):
+            lines.append(f"  {100 * count / total:6.2f}%  [{thread}] {func} {_short(filename)}")
+        lines.append("")
+
+        if len(self.snapshots) >= 2:
+            first, last = self.snapshots[0][1], self.snapshots[-1][1]
+            lines.append(f"Top {self.top} allocation sites by growth")
+            for stat in last.compare_to(first, "lineno")[:self.top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB  {stat.size / 1024:10.1f} KiB  "
+                             f"{stat.count_diff:+8d} blocks  {_short(frame.filename)}:{frame.lineno}")
+            lines.append("")
+            lines.append("Traced memory over time")
+            for ts, snap in self.snapshots:
+                size = sum(stat.size for stat in snap.statistics("filename"))
+                lines.append(f"  {ts:8.1f}s  {size / 1024 / 1024:8.2f} MiB")
+            lines.append("")
+
+        if self.probes:
+            lines.append("Probes over time")
+            lines.append("  " + f"{'t':>8}  " + "  ".join(f"{name:>16}" for name in self.probes))
+            for ts, values in self.probe_series:
+                lines.append(f"  {ts:7.1f}s  " + "  ".join(f"{values.get(name, float('nan')):>16,.0f}"
+                                                          for name in self.probes))
+        return "\n".join(lines)
+
+    def write_report(self, path: Optional[str] = None) -> str:
+        path = path or os.path.join(LOG_PATH, f"profile_{self.name}_{datetime.now():%Y%m%d_%H%M%S}.txt")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report() + "\n")
+        log_message(f"Profile report written to {path}")
+        return path
+
+
+def _short(filename: str) -> str:
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
+
+
+async def run_for(coro, duration: Optional[float] = None):
+    """Awaits ``coro``, cancelling it after ``duration`` seconds if given."""
+    try:
+        await asyncio.wait_for(coro, timeout=duration)
+    except asyncio.TimeoutError:
+        log_message(f"Run stopped after {duration:.0f}s")
+
+
+async def run_profiled(coro, session: ProfileSession, duration: Optional[float] = None,
+                       report_path: Optional[str] = None) -> str:
+    with session:
+        await run_for(coro, duration)
+    return session.write_report(report_path)
+
+
+def add_profile_arguments(parser, duration: bool = True):
+    """``duration=False`` leaves out ``--duration`` for entry points that are not a cancellable loop."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", action="store_true", help="run with CPU sampling and tracemalloc snapshots")
+    if duration:
+        group.add_argument("--duration", type=float, default=None, help="stop the run after this many seconds")
+    group.add_argument("--sample-interval", type=float, default=0.005, help="CPU sampling period in seconds")
+    group.add_argument("--snapshot-interval", type=float, default=10.0, help="seconds between memory snapshots")
+    group.add_argument("--report", default=None, help="report path (default: LOG_PATH/profile_<name>_<time>.txt)")
+    return parser
+
+
+def session_from_args(args, name: str, probes: Optional[Dict[str, Callable[[], float]]] = None) -> ProfileSession:
+    return ProfileSession(name, sample_interval=args.sample_interval,
+                          snapshot_interval=args.snapshot_interval, probes=probes)